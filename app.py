@@ -1,9 +1,7 @@
 import streamlit as st
-from modules.registro import registro_page
-from modules.analytics import analytics_page
-from modules.heatmaps import heatmaps_page
-from modules.evolucion import evolucion_page  # Nueva pestaña
 from utils.i18n import get_text
+from utils.paginas import PAGINAS, cargar_pagina, marcar_primera_pagina, reporte_arranque
+from utils.instrumentacion import CLAVE_ACTIVO, activo, exportar_jsonl, iniciar_rerun, registros
 
 # Configuración de página
 st.set_page_config(
@@ -16,8 +14,7 @@ st.set_page_config(
 LOGO_PATH = "Cavalry_FC_logo.svg"
 
 def main():
-    # Inicialización de estado de sesión
-    st.session_state.setdefault("registro", [])
+    iniciar_rerun()
     
     # Configuración inicial de idioma
     lang = "es"
@@ -35,13 +32,8 @@ def main():
             index=0
         ) == "Español" else "en"
 
-        # Navegación
-        opciones_navegacion = [
-            get_text(lang, "live_registration"),
-            get_text(lang, "analytics_panel"),
-            get_text(lang, "heatmaps_tab"),
-            get_text(lang, "evolution_tab")  # Nueva pestaña
-        ]
+        # Navegación (las páginas se importan recién al elegirlas)
+        opciones_navegacion = [get_text(lang, p["clave"]) for p in PAGINAS]
 
         pagina = st.radio(
             get_text(lang, "select_module"),
@@ -51,20 +43,56 @@ def main():
 
     # Gestión de navegación
     pagina_idx = opciones_navegacion.index(pagina)
+    entrada = PAGINAS[pagina_idx]
 
     # Router de módulos
-    if pagina_idx == 0:
+    acceso = True
+    if entrada["clave"] == "live_registration":
         access_code = st.text_input("🔐 Enter access code to proceed:", type="password")
-        if access_code == "CAV25":
-            registro_page(lang)
+        acceso = access_code == "CAV25"
+
+    if not acceso:
+        st.warning("Access denied. Please enter the correct code.")
+    elif entrada["lang"]:
+        cargar_pagina(entrada)(lang)
+    else:
+        cargar_pagina(entrada)()
+    marcar_primera_pagina()
+    mostrar_reporte_arranque(lang)
+    mostrar_panel_depuracion(lang)
+
+def mostrar_reporte_arranque(lang: str):
+    reporte = reporte_arranque()
+    with st.sidebar.expander(get_text(lang, "startup_report")):
+        if reporte["arranque_frio"] is not None:
+            st.caption(f"{get_text(lang, 'cold_start')}: {reporte['arranque_frio']:.2f} s")
+        for modulo, segundos in reporte["importes"].items():
+            st.caption(f"import {modulo}: {segundos:.2f} s")
+
+def mostrar_panel_depuracion(lang: str):
+    # Opt-in: con la casilla activada, las páginas registran sus pasos desde el próximo rerun
+    with st.sidebar:
+        st.checkbox(get_text(lang, "debug_panel"), key=CLAVE_ACTIVO)
+        if not activo():
+            return
+        pasos = registros(solo_ultimo_rerun=True)
+        if pasos:
+            st.dataframe(
+                [
+                    {"paso": "· " * p["nivel"] + p["paso"], **{k: p[k] for k in ("segundos", "filas", "cache", "memoria_mb")}}
+                    for p in pasos
+                ],
+                hide_index=True,
+                use_container_width=True
+            )
         else:
-            st.warning("Access denied. Please enter the correct code.")
-    elif pagina_idx == 1:
-        analytics_page(lang)
-    elif pagina_idx == 2:
-        heatmaps_page()
-    elif pagina_idx == 3:
-        evolucion_page(lang)
+            st.caption(get_text(lang, "debug_no_steps"))
+        st.download_button(
+            get_text(lang, "debug_export"),
+            data=exportar_jsonl(registros()),
+            file_name="instrumentacion.jsonl",
+            mime="application/jsonl"
+        )
 
 if __name__ == "__main__":
     main()
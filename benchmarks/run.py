@@ -0,0 +1,293 @@
+"""Benchmarks del camino de datos de cada página sobre datos sintéticos.
+
+Uso (desde la raíz del repo):
+
+    python -m benchmarks.run                      # 1k, 100k y 1M filas
+    python -m benchmarks.run --filas 1000 100000 --comparar benchmarks/resultados/base.json
+    python -m benchmarks.run --sin-excel           # sin los libros de temporada
+
+Las funciones de página se ejecutan en el modo "bare" de Streamlit (sin
+servidor), donde los st.* no emiten nada: se mide carga, filtrado,
+agregación y construcción de figuras, no el navegador. También se mide el
+import en frío del router y de cada página (`--sin-arranque` lo omite).
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import pandas as pd
+import streamlit as st
+
+from benchmarks import sintetico
+from modules.analytics import FILTROS_CATEGORICOS, construir_figuras, preparar_eventos
+from modules.heatmaps import heatmaps_page
+from utils import consultas, densidad, esquema, event_store, paralelo, render_pitch, season_stats
+from utils.densidad import conteo_zonas, densidad_zonas
+from utils.filtros import construir_indice, etiqueta_partido, filtrar_filas, opciones
+from utils.render_pitch import heatmap_png
+
+RESULTADOS_DIR = Path(__file__).resolve().parent / "resultados"
+TAMANOS = [1_000, 100_000, 1_000_000]
+LANG = "es"
+
+
+def medir(fn, repeticiones: int = 3) -> dict:
+    """Mejor tiempo de pared en `repeticiones` y pico de memoria de una corrida aparte."""
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        fn()
+        tiempos.append(time.perf_counter() - inicio)
+    tracemalloc.start()
+    try:
+        fn()
+        _, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"segundos": round(min(tiempos), 6), "pico_mb": round(pico / 2**20, 3)}
+
+
+def _limpiar_caches_heatmap():
+    densidad._densidad.cache_clear()
+    densidad.kernels_zonas.cache_clear()
+    render_pitch.limpiar_pngs()
+
+
+def benchmark_tamano(filas: int, directorio: Path, excel: bool = True) -> tuple:
+    """(tiempos por etapa, bytes por evento del CSV crudo y del almacén tipado)."""
+    repeticiones = 1 if filas >= 1_000_000 else 3
+    etapas = {}
+
+    # --- Archivos sintéticos ---
+    csv_path = directorio / "master_abp.csv"
+    sintetico.master_abp(filas).to_csv(csv_path, index=False)
+    sintetico.matches(filas).to_csv(directorio / "matches.csv", index=False)
+    for year in (2024, 2025) if excel else ():
+        sintetico.season_stats(filas, year).to_excel(directorio / f"Cavalry{year}stats.xlsx", index=False)
+
+    # --- analytics.cargar_datos: ingesta particionada y lecturas con y sin poda ---
+    rutas = (event_store.CACHE_DIR, event_store.PARTICIONES_DIR, event_store.MANIFIESTO_PATH)
+    event_store.CACHE_DIR = directorio / "abp"
+    event_store.PARTICIONES_DIR = event_store.CACHE_DIR / "eventos"
+    event_store.MANIFIESTO_PATH = event_store.CACHE_DIR / "particiones.json"
+    try:
+        contenido = csv_path.read_bytes()
+        etapas["store.ingesta_csv"] = medir(
+            lambda: event_store._guardar("Cavalry FC", contenido, {"revisado": time.time() + 3600}),
+            repeticiones
+        )
+
+        def cargar(**poda):
+            event_store._memoria.clear()
+            return event_store.cargar_eventos(clubes=["Cavalry FC"], **poda)
+
+        etapas["store.cargar_jornada"] = medir(lambda: cargar(jornadas=["Rueda 1"]), repeticiones)
+        crudo = pd.read_csv(csv_path)
+        etapas["esquema.validar"] = medir(lambda: esquema.validar(crudo, "eventos"), repeticiones)
+        memoria = esquema.reporte_memoria(crudo, cargar())
+        del crudo
+        etapas["analytics.cargar_datos"] = medir(lambda: preparar_eventos(LANG, cargar()), repeticiones)
+        df = preparar_eventos(LANG, cargar())
+
+        # Refresco tras un partido: ~30 filas nuevas al final del CSV
+        ultima = event_store._ultima_fila(contenido)
+        partido = b"".join(contenido.splitlines(keepends=True)[-30:])
+
+        def anexar():
+            meta = event_store._leer_json(event_store._meta_path("Cavalry FC"))
+            event_store._anexar("Cavalry FC", ultima + partido, meta)
+
+        etapas["store.anexar_partido"] = medir(anexar, repeticiones)
+    finally:
+        event_store.CACHE_DIR, event_store.PARTICIONES_DIR, event_store.MANIFIESTO_PATH = rutas
+
+    # --- configurar_filtros: índice (una vez por versión) y filtrado por rerun ---
+    def indexar():
+        ordenado = df.sort_values('Fecha', ascending=False, kind='stable').reset_index(drop=True)
+        ordenado['Partido'] = etiqueta_partido(ordenado)
+        return ordenado, construir_indice(ordenado, FILTROS_CATEGORICOS, 'Minuto')
+
+    etapas["configurar_filtros.indice"] = medir(indexar, repeticiones)
+    ordenado, indice = indexar()
+    selecciones = {col: opciones(indice, col) for col in FILTROS_CATEGORICOS}
+    selecciones['Partido'] = selecciones['Partido'][: max(1, len(selecciones['Partido']) // 2)]
+    selecciones['Ejecutor'] = selecciones['Ejecutor'][:5]
+
+    def filtrar():
+        indice["memo"].clear()
+        return ordenado.iloc[filtrar_filas(indice, selecciones, (10, 80))]
+
+    etapas["configurar_filtros.filtrar"] = medir(filtrar, repeticiones)
+    df_filtrado = filtrar()
+
+    # --- Consultas analíticas en frío (lo que cachea analytics.consulta) ---
+    def secciones():
+        consultas.kpis(df_filtrado, "Sí", "Cavalry FC")
+        consultas.acciones_por_jornada(df_filtrado)
+        consultas.efectividad_ejecutor(df_filtrado, "Sí")
+        consultas.composicion_resultados(df_filtrado, "Total")
+
+    etapas["consultas.secciones"] = medir(secciones, repeticiones)
+    etapas["consultas.ranking_parte_cuerpo"] = medir(
+        lambda: consultas.ranking_parte_cuerpo(df_filtrado, ["Córner", "Tiro libre"], "Ofensiva", "Defensiva"),
+        repeticiones
+    )
+
+    # --- Heatmap: conteo por zona, densidad y PNG, en frío ---
+    def heatmap():
+        _limpiar_caches_heatmap()
+        conteos = conteo_zonas(df_filtrado['Zona Remate'])
+        densidad_zonas(conteos, 0.65)
+        heatmap_png("analytics", tuple(int(c) for c in conteos), 0.65, 'Reds', 0.75, "bench")
+
+    etapas["heatmap.densidad_png"] = medir(heatmap, repeticiones)
+
+    # --- analytics: todas las figuras de la página, en serie y en paralelo ---
+    # Cada corrida quita una fila más para que ninguna caché (tampoco la de los procesos) acierte
+    corrida = iter(range(1, 10_000))
+
+    def figuras():
+        i = next(corrida)
+        futuros = construir_figuras(LANG, df_filtrado.iloc[i:], ("bench", i))
+        for futuro in futuros.values():
+            for f in ([f for _, f in futuro] if isinstance(futuro, list) else [futuro]):
+                if f is not None:
+                    f.result()
+
+    modo = paralelo.RENDER_PARALELO
+    try:
+        for paralelo.RENDER_PARALELO in (False, True):
+            figuras()  # arranque del pool fuera de la medición
+            nombre = "paralelo" if paralelo.RENDER_PARALELO else "serie"
+            etapas[f"analytics.figuras_{nombre}"] = medir(figuras, repeticiones)
+    finally:
+        paralelo.RENDER_PARALELO = modo
+
+    # --- heatmaps_page: lectura de matches.csv y filtrado ---
+    def pagina_heatmaps():
+        st.cache_data.clear()
+        heatmaps_page()
+
+    cwd = os.getcwd()
+    os.chdir(directorio)
+    try:
+        etapas["heatmaps_page"] = medir(pagina_heatmaps, repeticiones)
+    finally:
+        os.chdir(cwd)
+
+    # --- evolucion_page: conversión xlsx -> caché binaria y lecturas posteriores ---
+    if not excel:
+        return etapas, memoria
+    cache_dir = season_stats.CACHE_DIR
+    season_stats.CACHE_DIR = directorio / "seasons"
+    try:
+        def temporadas_frio():
+            season_stats._frames.clear()
+            for path in season_stats.CACHE_DIR.glob("*.parquet"):
+                path.unlink()
+            season_stats.cargar_temporadas(directorio)
+
+        def temporadas_tibio():
+            season_stats._frames.clear()
+            season_stats.cargar_temporadas(directorio)
+
+        etapas["evolucion.cargar_temporadas_xlsx"] = medir(temporadas_frio, 1)
+        etapas["evolucion.cargar_temporadas_cache"] = medir(temporadas_tibio, repeticiones)
+    finally:
+        season_stats.CACHE_DIR = cache_dir
+
+    return etapas, memoria
+
+
+def _importar(modulos: list) -> float:
+    # Import en frío en un intérprete nuevo (sys.modules vacío)
+    codigo = (
+        "import time; inicio = time.perf_counter()\n"
+        + "".join(f"import {m}\n" for m in modulos)
+        + "print(time.perf_counter() - inicio)"
+    )
+    salida = subprocess.check_output([sys.executable, "-c", codigo], cwd=Path(__file__).resolve().parent.parent,
+                                     text=True, stderr=subprocess.DEVNULL)
+    return float(salida.strip().splitlines()[-1])
+
+
+def benchmark_arranque(repeticiones: int = 3) -> dict:
+    """Costo de import del router (app.py) y, aparte, de cada página del registro."""
+    from utils.paginas import PAGINAS
+
+    base = ["streamlit", "utils.i18n", "utils.paginas"]
+    etapas = {"app.arranque": {"segundos": round(min(_importar(base) for _ in range(repeticiones)), 6)}}
+    for pagina in PAGINAS:
+        total = min(_importar(base + [pagina["modulo"]]) for _ in range(repeticiones))
+        etapas[f"import.{pagina['modulo']}"] = {"segundos": round(total - etapas["app.arranque"]["segundos"], 6)}
+    return etapas
+
+
+def _git_rev() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def comparar(actual: dict, base: dict):
+    print(f"{'filas':>9}  {'etapa':<36} {'base (s)':>10} {'actual (s)':>10} {'ratio':>7}")
+    for filas, etapas in actual["resultados"].items():
+        for etapa, medida in etapas.items():
+            previa = base.get("resultados", {}).get(filas, {}).get(etapa)
+            if previa is None:
+                continue
+            ratio = medida["segundos"] / previa["segundos"] if previa["segundos"] else float("inf")
+            print(f"{filas:>9}  {etapa:<36} {previa['segundos']:>10.4f} {medida['segundos']:>10.4f} {ratio:>6.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--filas", type=int, nargs="+", default=TAMANOS)
+    parser.add_argument("--salida", type=Path, default=None, help="JSON de resultados")
+    parser.add_argument("--comparar", type=Path, default=None, help="JSON de una corrida anterior")
+    parser.add_argument("--sin-excel", action="store_true", help="omitir los libros de temporada (lentos de generar)")
+    parser.add_argument("--sin-arranque", action="store_true", help="omitir la medición de imports en frío")
+    args = parser.parse_args()
+
+    resultado = {
+        "fecha": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "git": _git_rev(),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "resultados": {},
+        "memoria": {},
+    }
+    if not args.sin_arranque:
+        print("== arranque", file=sys.stderr)
+        resultado["resultados"]["arranque"] = benchmark_arranque()
+        for etapa, medida in resultado["resultados"]["arranque"].items():
+            print(f"   {etapa:<36} {medida['segundos']:>9.4f} s", file=sys.stderr)
+    for filas in args.filas:
+        with tempfile.TemporaryDirectory() as tmp:
+            print(f"== {filas:,} filas", file=sys.stderr)
+            etapas, memoria = benchmark_tamano(filas, Path(tmp), excel=not args.sin_excel)
+        resultado["resultados"][str(filas)] = etapas
+        resultado["memoria"][str(filas)] = memoria
+        for etapa, medida in etapas.items():
+            print(f"   {etapa:<36} {medida['segundos']:>9.4f} s {medida['pico_mb']:>9.1f} MB", file=sys.stderr)
+        print(f"   {'bytes/evento (csv -> tipado)':<36} {memoria['antes']:>9.1f} -> {memoria['despues']:.1f}", file=sys.stderr)
+
+    salida = args.salida or RESULTADOS_DIR / f"{resultado['fecha'].replace(':', '')}.json"
+    salida.parent.mkdir(parents=True, exist_ok=True)
+    salida.write_text(json.dumps(resultado, indent=2, ensure_ascii=False), encoding="utf-8")
+    print(f"Resultados en {salida}", file=sys.stderr)
+
+    if args.comparar:
+        comparar(resultado, json.loads(args.comparar.read_text(encoding="utf-8")))
+
+
+if __name__ == "__main__":
+    main()
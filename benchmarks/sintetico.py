@@ -0,0 +1,114 @@
+"""Generadores de datos sintéticos con el mismo formato que los archivos del repo."""
+import numpy as np
+import pandas as pd
+
+from utils.zonas import ZONAS_COORDS, ZONA_X, ZONA_Y, codificar_zonas
+
+EQUIPOS = [
+    "Atlético Ottawa", "Forge FC", "HFX Wanderers FC",
+    "Pacific FC", "Valour FC", "Vancouver FC", "York United FC"
+]
+JUGADORES = [
+    "Ali Musse", "Fraser Aird", "Sergio Camargo", "Shamit Shome", "Tobias Warschewski",
+    "Michael Baldisimo", "Jay Herdman", "Charlie Trafford", "Callum Montgomery", "Eryk Kobza"
+]
+ZONAS_CAMPO = [z for z in ZONAS_COORDS if z != "Penal"]
+
+
+def _fechas(inicio: str, dia: np.ndarray, formato: str) -> np.ndarray:
+    # Formatear solo los 200 días posibles y repartirlos por índice
+    dias = pd.Timestamp(inicio) + pd.to_timedelta(np.arange(200), unit="D")
+    return np.asarray(dias.strftime(formato), dtype=object)[dia % 200]
+
+
+def master_abp(filas: int, seed: int = 0) -> pd.DataFrame:
+    """Eventos ABP con las columnas y valores de master_abp.csv."""
+    rng = np.random.default_rng(seed)
+    n_partidos = max(1, filas // 30)
+    partido = rng.integers(0, n_partidos, filas)
+    # Primera fila con día > 12 para que pandas infiera el formato m/d/Y, como en el CSV real
+    partido[0] = 0
+    rival = np.asarray(EQUIPOS, dtype=object)[partido % len(EQUIPOS)]
+    minuto = rng.integers(0, 92, filas)
+    accion = rng.choice(["Córner", "Tiro libre", "Lateral", "Penal"], filas, p=[0.5, 0.3, 0.15, 0.05])
+    equipo = rng.choice(["Cavalry FC", "Rival"], filas)
+    ejecutor = np.where(equipo == "Rival", "Rival", rng.choice(JUGADORES, filas))
+    zona_saque = rng.choice(np.asarray(ZONAS_CAMPO, dtype=object), filas)
+    zona_remate = rng.choice(np.asarray(ZONAS_CAMPO, dtype=object), filas)
+    penal = accion == "Penal"
+    zona_saque[penal] = "Penal"
+    zona_remate[penal] = "Penal"
+    gol = rng.choice(["Sí", "No"], filas, p=[0.05, 0.95])
+    resultado = np.where(
+        gol == "Sí", "Gol",
+        rng.choice(["Despeje", "Posesión rival", "Disparo desviado", "Disparo al arco"], filas)
+    )
+    codigo_saque = codificar_zonas(pd.Series(zona_saque))
+    codigo_remate = codificar_zonas(pd.Series(zona_remate))
+
+    return pd.DataFrame({
+        "Jornada": np.asarray(["Rueda 1", "Rueda 2", "Rueda 3", "Rueda 4"])[(partido // 7) % 4],
+        "Rival": rival,
+        "Condición": np.where(partido % 2 == 0, "Local", "Visitante"),
+        "Fecha": _fechas("2025-04-18", partido, "%-m/%-d/%Y"),
+        "Minuto": minuto,
+        "Periodo": np.where(minuto <= 45, "1T", "2T"),
+        "Acción": accion,
+        "Equipo": equipo,
+        "Ejecutor": ejecutor,
+        "Zona Saque": zona_saque,
+        "Zona Remate": zona_remate,
+        "x_saque": ZONA_X[codigo_saque],
+        "y_saque": ZONA_Y[codigo_saque],
+        "x_remate": ZONA_X[codigo_remate],
+        "y_remate": ZONA_Y[codigo_remate],
+        "Primer Contacto": rng.choice(JUGADORES + ["Opponent"], filas),
+        "Parte Cuerpo": np.where(penal, "N/A", rng.choice(["Cabeza", "Pie", "Otro"], filas)),
+        "Segundo Contacto": "",
+        "Gol": gol,
+        "Resultado": resultado,
+        "Perfil": rng.choice(["Hábil", "No hábil"], filas),
+        "Estrategia": rng.choice(["Sí", "No"], filas),
+        "Tipo Ejecución": rng.choice(["Centro", "Pase corto", "Disparo directo"], filas),
+    })
+
+
+def matches(filas: int, seed: int = 0) -> pd.DataFrame:
+    """Planilla de jugadores por partido con las columnas de matches.csv."""
+    rng = np.random.default_rng(seed)
+    partido = np.arange(filas) // 14
+    jugador = rng.integers(0, 400, filas)
+    return pd.DataFrame({
+        "Round": partido % 28 + 1,
+        "Date": _fechas("2025-04-05", partido, "%-m/%-d/%Y"),
+        "Local/Visit": np.where(partido % 2 == 0, "Local", "Visit"),
+        "Cavalry/Opponent": np.asarray(EQUIPOS, dtype=object)[partido % len(EQUIPOS)],
+        "Team": np.where(np.arange(filas) % 14 < 11, "Cavalry", "Opponent"),
+        "Position": rng.choice(["GK", "RB", "LB", "DF", "DMF", "MF", "AMF", "RW", "LW", "FW", "CF"], filas),
+        "Player": np.char.add("Player ", jugador.astype(str)),
+        # Sin URL: el benchmark mide filtrado, no descargas
+        "Photo": "",
+        "Minutes played": rng.integers(1, 91, filas),
+        "Goals": rng.integers(0, 2, filas),
+        "Assists": rng.integers(0, 2, filas),
+        "Saves": rng.integers(0, 4, filas),
+        "Goal Against": rng.integers(0, 3, filas),
+        "heatmap": "",
+    })
+
+
+def season_stats(filas: int, year: int, seed: int = 0) -> pd.DataFrame:
+    """Libro de temporada con las columnas que usa evolucion_page."""
+    rng = np.random.default_rng(seed + year)
+    ppda_1t = rng.uniform(5, 20, filas).round(2)
+    ppda_2t = rng.uniform(5, 20, filas).round(2)
+    return pd.DataFrame({
+        "Round": np.char.add("Round ", (np.arange(filas) % 28 + 1).astype(str)),
+        "Date": _fechas(f"{year}-04-05", np.arange(filas), "%Y-%m-%d"),
+        "Match": np.char.add("Cavalry - ", rng.choice(EQUIPOS, filas)),
+        "xG": rng.uniform(0, 3, filas).round(2),
+        "Possession, %": rng.uniform(35, 65, filas).round(1),
+        "PPDA": ((ppda_1t + ppda_2t) / 2).round(2),
+        "PPDA 1st Half": ppda_1t,
+        "PPDA 2nd Half": ppda_2t,
+    })
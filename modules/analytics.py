@@ -1,15 +1,40 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
 import pandas as pd
 import streamlit as st
-import matplotlib.pyplot as plt
 import plotly.express as px
-from mplsoccer import VerticalPitch
-from utils.i18n import get_text
+import plotly.graph_objects as go
+import plotly.io as pio
+from utils import consultas
+from utils.i18n import get_text, translate_column
+from utils.esquema import describir
+from utils.event_store import cargar_eventos, catalogo, podar, version_store, violaciones_store
+from utils.instrumentacion import instrumentar, marcar_fallo, medir
+from utils.filtros import construir_indice, etiqueta_partido, filtrar_filas, opciones
+from utils.densidad import conteo_zonas
+from utils.exportar import mostrar_exportacion
+from utils.paralelo import enviar, inmediato, pool_hilos
+from utils.render_pitch import heatmap_png_futuro
+
+# Modo de datos grandes: desde este número de eventos filtrados los gráficos de puntos
+# pasan a WebGL y reciben solo resúmenes o una muestra armada en el servidor
+UMBRAL_GRAFICOS_GRANDES = 5000
+MAX_PUNTOS = 2000
+MAX_TRAZAS_EFECTIVIDAD = 30  # con más ejecutores, una sola traza WebGL en vez de una por ejecutor
+
+# JSON de las figuras de Plotly ya serializadas, por (figura, clave de filtros)
+MAX_FIGURAS = 64
+_figuras = OrderedDict()
+_lock_figuras = threading.Lock()
 
 def analytics_page(lang: str):
     st.title(get_text(lang, "analytics_title"))
     
     try:
-        df = cargar_datos(lang)
+        particiones = seleccionar_particiones(lang)
+        df = cargar_datos(lang, particiones)
         if df.empty:
             st.warning(get_text(lang, "empty_db_warning"))
             return
@@ -17,43 +42,73 @@ def analytics_page(lang: str):
         st.error(get_text(lang, "critical_error").format(error=str(e)))
         return
 
-    df_filtrado = configurar_filtros(lang, df)
-    mostrar_kpis(lang, df_filtrado)
-    generar_seccion_espacial(lang, df_filtrado)
-    generar_seccion_temporal(lang, df_filtrado)
-    generar_seccion_efectividad(lang, df_filtrado)
-    configurar_descarga(lang, df_filtrado)
-    mostrar_ranking_parte_cuerpo(lang, df_filtrado)
-
-def cargar_datos(lang: str):
-    # Cargar datos desde GitHub
-    url = "https://raw.githubusercontent.com/felipeorma/abp/main/master_abp.csv"
-    df = pd.read_csv(url)
-    
-    # Renombrar columnas según el CSV
-    df = df.rename(columns={
-        'jornada': 'Jornada',
-        'fecha': 'Fecha',
-        'rival': 'Rival',
-        'condición': 'Condición',
-        'periodo': 'Periodo',
-        'minuto': 'Minuto',
-        'acción': 'Acción',
-        'equipo': 'Equipo',
-        'ejecutor': 'Ejecutor',
-        'zona_saque': 'Zona Saque',
-        'zona_remate': 'Zona Remate',
-        'gol': 'Gol',
-        'resultado': 'Resultado',
-        'parte_cuerpo': 'Parte Cuerpo'
-    })
-    
+    mostrar_violaciones(lang, particiones[1])
+    df_filtrado, clave = configurar_filtros(lang, df, particiones)
+    # Las figuras se construyen en paralelo y se emiten en el orden de la página
+    figuras = construir_figuras(lang, df_filtrado, clave)
+    mostrar_kpis(lang, df_filtrado, clave, particiones[1])
+    generar_seccion_espacial(lang, figuras)
+    generar_seccion_temporal(lang, figuras)
+    generar_seccion_efectividad(lang, figuras)
+    configurar_descarga(lang, df_filtrado, clave, figuras)
+    mostrar_ranking_parte_cuerpo(lang, figuras)
+
+def mostrar_violaciones(lang: str, club: str):
+    # Valores del CSV que no encajaron en el esquema al ingerirlos (quedaron vacíos)
+    violaciones = violaciones_store(club)
+    if violaciones:
+        with st.expander(get_text(lang, "schema_warnings").format(n=len(violaciones))):
+            for violacion in violaciones:
+                st.caption(describir(violacion))
+
+@instrumentar("analytics.seleccionar_particiones")
+def seleccionar_particiones(lang: str):
+    # Temporada, club y jornadas salen del manifiesto: se eligen antes de leer eventos
+    entradas = catalogo()
+    with st.sidebar:
+        st.header(get_text(lang, "advanced_filters"))
+
+        col1, col2 = st.columns(2)
+        with col1:
+            temporadas = sorted({p["temporada"] for p in entradas}, reverse=True)
+            temporada = st.selectbox(get_text(lang, "season"), temporadas)
+        with col2:
+            clubes = sorted({p["equipo"] for p in podar(entradas, temporadas=[temporada])})
+            club = st.selectbox(get_text(lang, "club"), clubes)
+
+        opciones_jornada = list(dict.fromkeys(
+            p["jornada"] for p in podar(entradas, temporadas=[temporada], clubes=[club])
+        ))
+        jornadas = st.multiselect(
+            get_text(lang, "round"),
+            options=opciones_jornada,
+            default=opciones_jornada
+        )
+    return temporada, club, tuple(jornadas)
+
+def cargar_datos(lang: str, particiones: tuple):
+    # Cargar solo las particiones elegidas del almacén local (revalidado contra GitHub)
+    return eventos_compartidos((version_store(), lang, particiones))
+
+@instrumentar("analytics.cargar_datos", cache=True)
+@st.cache_resource(max_entries=4, show_spinner=False)
+def eventos_compartidos(clave: tuple):
+    # Un solo frame tipado por (versión de datos, idioma, particiones) para todas las sesiones: no modificar
+    marcar_fallo()
+    _, lang, (temporada, club, jornadas) = clave
+    df = cargar_eventos(temporadas=[temporada], clubes=[club], jornadas=jornadas)
+    if df.empty:
+        return df
+    return preparar_eventos(lang, df)
+
+def preparar_eventos(lang: str, df):
+    # Columnas y tipos ya validados al ingerir (utils.esquema.ESQUEMA_EVENTOS)
     # Procesamiento de fechas
     df['Fecha'] = pd.to_datetime(df['Fecha'], dayfirst=True, errors='coerce')
     df = df.dropna(subset=['Fecha'])
     
-    # Traducir valores clave
-    df['Gol'] = df['Gol'].map({'Sí': get_text(lang, 'yes'), 'No': get_text(lang, 'no')})
+    # Traducir valores clave (Gol llega booleano del almacén tipado)
+    df['Gol'] = df['Gol'].map({True: get_text(lang, 'yes'), False: get_text(lang, 'no')}).astype('category')
     
     # Mapeo de acciones
     action_translation = {
@@ -64,64 +119,68 @@ def cargar_datos(lang: str):
         'Centro': 'cross',
         'Remate': 'shot'
     }
-    df['Acción'] = df['Acción'].map(action_translation).apply(lambda x: get_text(lang, x))
-    
-    # Validación final
-    required_columns = ['Jornada', 'Rival', 'Periodo', 'Minuto', 'Acción', 'Equipo', 'Fecha']
-    if not all(col in df.columns for col in required_columns):
-        return pd.DataFrame()
+    df['Acción'] = translate_column(lang, df['Acción'], action_translation).astype('category')
     
     return df.dropna(subset=['Zona Saque', 'Zona Remate', 'Ejecutor'])
 
-def configurar_filtros(lang: str, df):
+FILTROS_CATEGORICOS = ['Partido', 'Condición', 'Acción', 'Ejecutor']
+
+@instrumentar("analytics.preparar_filtros", cache=True)
+@st.cache_resource(max_entries=4)
+def preparar_filtros(clave: tuple, _df):
+    # Frame ordenado + índice de filtros, uno por (versión de datos, idioma, particiones)
+    marcar_fallo()
+    df = _df.sort_values('Fecha', ascending=False, kind='stable').reset_index(drop=True)
+    df['Fecha_str'] = df['Fecha'].dt.strftime('%d %b')
+    df['Partido'] = etiqueta_partido(df)
+    indice = construir_indice(df, FILTROS_CATEGORICOS, 'Minuto')
+    return df, indice
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def _consulta(nombre: str, clave: tuple, _df, *args):
+    # `clave` (versión de datos, idioma, filtros) identifica al frame filtrado: no se hashea `_df`
+    marcar_fallo()
+    return getattr(consultas, nombre)(_df, *args)
+
+def consulta(nombre: str, clave: tuple, df, *args):
+    with medir(f"analytics.consulta.{nombre}", filas=len(df), cache=True):
+        return _consulta(nombre, clave, df, *args)
+
+@instrumentar("analytics.filtrar")
+def configurar_filtros(lang: str, df, particiones: tuple):
     with st.sidebar:
-        st.header(get_text(lang, "advanced_filters"))
-        
-        # Procesar fechas para mostrar
-        df = df.sort_values('Fecha', ascending=False)
-        df['Fecha_str'] = df['Fecha'].dt.strftime('%d %b')
-        df['Partido'] = df.apply(
-            lambda x: f"{x['Fecha_str']} vs {x['Rival']}", 
-            axis=1
-        )
+        # Procesar fechas para mostrar (cacheado junto con el índice)
+        df, indice = preparar_filtros((version_store(), lang, particiones), df)
         
         # Filtros interactivos
         partidos_seleccionados = st.multiselect(
             get_text(lang, "select_matches"),
-            options=df['Partido'].unique(),
-            default=df['Partido'].unique(),
+            options=opciones(indice, 'Partido'),
+            default=opciones(indice, 'Partido'),
             help=get_text(lang, "select_matches_help")
         )
         
         col1, col2 = st.columns(2)
         with col1:
-            jornadas = st.multiselect(
-                get_text(lang, "round"),
-                options=df['Jornada'].unique(),
-                default=df['Jornada'].unique()
-            )
-        with col2:
             condiciones = st.multiselect(
                 get_text(lang, "condition"),
-                options=df['Condición'].unique(),
-                default=df['Condición'].unique(),
+                options=opciones(indice, 'Condición'),
+                default=opciones(indice, 'Condición'),
                 format_func=lambda x: get_text(lang, f"condition_{x}")
             )
-
-        col3, col4 = st.columns(2)
-        with col3:
+        with col2:
             acciones = st.multiselect(
                 get_text(lang, "actions"),
-                options=df['Acción'].unique(),
-                default=df['Acción'].unique()
-            )
-        with col4:
-            jugadores = st.multiselect(
-                get_text(lang, "players"),
-                options=df['Ejecutor'].unique(),
-                default=df['Ejecutor'].unique()
+                options=opciones(indice, 'Acción'),
+                default=opciones(indice, 'Acción')
             )
 
+        jugadores = st.multiselect(
+            get_text(lang, "players"),
+            options=opciones(indice, 'Ejecutor'),
+            default=opciones(indice, 'Ejecutor')
+        )
+
         min_min, max_min = int(df['Minuto'].min()), int(df['Minuto'].max())
         rango_minutos = st.slider(
             get_text(lang, "minutes"),
@@ -129,234 +188,320 @@ def configurar_filtros(lang: str, df):
             (min_min, max_min)
         )
         
-    return df[
-        (df['Partido'].isin(partidos_seleccionados)) &
-        (df['Jornada'].isin(jornadas)) &
-        (df['Condición'].isin(condiciones)) &
-        (df['Acción'].isin(acciones)) &
-        (df['Ejecutor'].isin(jugadores)) &
-        (df['Minuto'].between(*rango_minutos))
-    ]
+    selecciones = {
+        'Partido': partidos_seleccionados,
+        'Condición': condiciones,
+        'Acción': acciones,
+        'Ejecutor': jugadores
+    }
+    filas = filtrar_filas(indice, selecciones, rango_minutos)
+    clave = (
+        version_store(),
+        lang,
+        particiones,
+        tuple((col, tuple(sorted(map(str, sel)))) for col, sel in selecciones.items()),
+        tuple(rango_minutos)
+    )
+    return df.iloc[filas], clave
 
-def mostrar_kpis(lang: str, df):
+@instrumentar("analytics.render.kpis")
+def mostrar_kpis(lang: str, df, clave: tuple, club: str):
     cols = st.columns(5)
+    kpis = consulta("kpis", clave, df, get_text(lang, 'yes'), club)
     
     with cols[0]:
-        st.metric(get_text(lang, "registered_actions"), df.shape[0])
+        st.metric(get_text(lang, "registered_actions"), kpis["acciones"])
     
-    goles_favor = df[(df['Gol'] == get_text(lang, 'yes')) & (df['Equipo'] == 'Cavalry FC')].shape[0]
     with cols[1]:
-        st.metric(get_text(lang, "goals_for"), goles_favor)
+        st.metric(get_text(lang, "goals_for"), kpis["goles_favor"])
     
-    goles_contra = df[(df['Gol'] == get_text(lang, 'yes')) & (df['Equipo'] != 'Cavalry FC')].shape[0]
     with cols[2]:
-        st.metric(get_text(lang, "goals_against"), goles_contra)
+        st.metric(get_text(lang, "goals_against"), kpis["goles_contra"])
     
-    eficacia = (goles_favor / df.shape[0] * 100) if df.shape[0] > 0 else 0
     with cols[3]:
-        st.metric(get_text(lang, "offensive_effectiveness"), f"{eficacia:.1f}%")
+        st.metric(get_text(lang, "offensive_effectiveness"), f"{kpis['eficacia']:.1f}%")
     
-    eficacia_def = 100 - (goles_contra / df.shape[0] * 100) if df.shape[0] > 0 else 0
     with cols[4]:
-        st.metric(get_text(lang, "defensive_effectiveness"), f"{eficacia_def:.1f}%")
+        st.metric(get_text(lang, "defensive_effectiveness"), f"{kpis['eficacia_def']:.1f}%")
+
+@instrumentar("analytics.construir_figuras")
+def construir_figuras(lang: str, df, clave: tuple) -> dict:
+    """Lanza la construcción de cada figura independiente; devuelve Futures por nombre.
+
+    Los mapas de calor (matplotlib) van al pool de procesos de render y las
+    figuras de Plotly a hilos; las consultas cacheadas se resuelven aquí.
+    """
+    hilos = pool_hilos()
+    grande = len(df) > UMBRAL_GRAFICOS_GRANDES
+    if grande:
+        minutos = futuro_figura(
+            hilos, "minutos", clave, figura_minutos_grande, lang,
+            consulta("resumen_minutos", clave, df), consulta("muestra_minutos", clave, df, MAX_PUNTOS)
+        )
+    else:
+        minutos = futuro_figura(
+            hilos, "minutos", clave, figura_minutos, lang, consulta("distribucion_minutos", clave, df)
+        )
+    figuras = {
+        'mapa_saque': futuro_mapa_calor(lang, df, tipo='saque'),
+        'mapa_remate': futuro_mapa_calor(lang, df, tipo='remate'),
+        'jornada': futuro_figura(
+            hilos, "jornada", clave, figura_acciones_jornada, lang, consulta("acciones_por_jornada", clave, df)
+        ),
+        'minutos': minutos,
+        'efectividad': futuro_figura(
+            hilos, "efectividad", clave, figura_efectividad, lang,
+            consulta("efectividad_ejecutor", clave, df, get_text(lang, 'yes')), grande
+        ),
+        'composicion': futuro_figura(
+            hilos, "composicion", clave, figura_composicion, lang,
+            consulta("composicion_resultados", clave, df, get_text(lang, "total"))
+        ),
+    }
+
+    # Definir acciones ofensivas usando claves de traducción
+    ACCIONES_OFENSIVAS = [
+        get_text(lang, "corner"),
+        get_text(lang, "free_kick"),
+        get_text(lang, "throw_in"),
+        get_text(lang, "penalty"),
+        get_text(lang, "cross"),
+        get_text(lang, "shot")
+    ]
+    rankings = consulta(
+        "ranking_parte_cuerpo", clave, df,
+        ACCIONES_OFENSIVAS, get_text(lang, "offensive"), get_text(lang, "defensive")
+    )
+    figuras['ranking'] = [
+        (tipo, futuro_figura(hilos, f"ranking.{tipo}", clave, figura_ranking, lang, tipo, df_ranking, orden))
+        for tipo, df_ranking, orden in rankings
+    ]
+    return figuras
+
+def _serializar(fn, *args) -> str:
+    return fn(*args).to_json()
+
+def _guardar_figura(clave: tuple, futuro):
+    if futuro.exception() is None:
+        with _lock_figuras:
+            _figuras[clave] = futuro.result()
+            while len(_figuras) > MAX_FIGURAS:
+                _figuras.popitem(last=False)
+
+def futuro_figura(hilos, nombre: str, clave: tuple, fn, *args):
+    """JSON de la figura `fn(*args)` en el pool de hilos; Future ya resuelto si ya se serializó.
 
-def generar_seccion_espacial(lang: str, df):
+    `clave` (versión de datos, idioma, filtros) determina los datos: no se miran `args`.
+    """
+    clave_figura = (nombre, clave)
+    with _lock_figuras:
+        if clave_figura in _figuras:
+            _figuras.move_to_end(clave_figura)
+            return inmediato(lambda: _figuras[clave_figura])
+    futuro = enviar(hilos, _serializar, fn, *args)
+    futuro.add_done_callback(lambda f: _guardar_figura(clave_figura, f))
+    return futuro
+
+def mostrar_figura(futuro):
+    st.plotly_chart(pio.from_json(futuro.result()), use_container_width=True)
+
+@instrumentar("analytics.render.espacial")
+def generar_seccion_espacial(lang: str, figuras: dict):
     st.header(get_text(lang, "tactical_mapping"))
     col1, col2 = st.columns(2)
     
     with col1:
-        generar_mapa_calor(lang, df, tipo='saque')
+        generar_mapa_calor(lang, figuras['mapa_saque'], tipo='saque')
     with col2:
-        generar_mapa_calor(lang, df, tipo='remate')
-
-def generar_mapa_calor(lang: str, df, tipo='saque'):
-    zonas_coords = {
-        1: (120, 0), 2: (120, 80), 3: (93, 9), 4: (93, 71),
-        5: (114, 30), 6: (114, 50), 7: (114, 40), 8: (111, 15),
-        9: (111, 65), 10: (105, 35), 11: (105, 45), 12: (105, 25),
-        13: (105, 55), 14: (93, 29), 15: (93, 51), 16: (72, 20),
-        17: (72, 60), "Penal": (108, 40)
-    }
-    
+        generar_mapa_calor(lang, figuras['mapa_remate'], tipo='remate')
+
+def futuro_mapa_calor(lang: str, df, tipo='saque'):
     coord_col = 'Zona Saque' if tipo == 'saque' else 'Zona Remate'
     
-    df_temp = df.copy()
-    df_temp[coord_col] = df_temp[coord_col].apply(
-        lambda x: int(x) if str(x).isdigit() else x
-    )
-    df_coords = df_temp[coord_col].map(zonas_coords).dropna().apply(pd.Series)
-    
-    if df_coords.empty:
-        st.warning(get_text(lang, "no_data_warning").format(tipo=get_text(lang, tipo)))
-        return
+    # Conteo por zona: basta para construir (y memoizar) la densidad
+    conteos = conteo_zonas(df[coord_col])
     
-    df_coords.columns = ['x', 'y']
-    
-    pitch = VerticalPitch(
-        pitch_type='statsbomb',
-        pitch_color='grass',
-        line_color='white',
-        linewidth=1.2,
-        half=True,
-        goal_type='box'
-    )
+    if conteos.sum() == 0:
+        return None
     
-    fig, ax = plt.subplots(figsize=(12, 8))
-    pitch.draw(ax=ax)
-    
-    pitch.kdeplot(
-        df_coords['x'], df_coords['y'],
-        ax=ax,
+    return heatmap_png_futuro(
+        "analytics",
+        tuple(int(c) for c in conteos),
+        bw_adjust=0.65,
         cmap='Greens' if tipo == 'saque' else 'Reds',
-        levels=100,
-        fill=True,
         alpha=0.75,
-        bw_adjust=0.65,
-        zorder=2
+        titulo=get_text(lang, "density_title").format(tipo=get_text(lang, tipo))
+    )
+
+def generar_mapa_calor(lang: str, futuro, tipo='saque'):
+    if futuro is None:
+        st.warning(get_text(lang, "no_data_warning").format(tipo=get_text(lang, tipo)))
+        return
+    st.image(futuro.result(), use_column_width=True)
+
+def figura_acciones_jornada(lang: str, df_jornada):
+    return px.bar(
+        df_jornada, 
+        x='Jornada', 
+        y='Cantidad',
+        color='Periodo',
+        title=get_text(lang, "actions_by_round"),
+        labels={'Cantidad': get_text(lang, "actions")}
     )
-    
-    ax.set_title(get_text(lang, "density_title").format(tipo=get_text(lang, tipo)), 
-                fontsize=16, 
-                pad=20,
-                fontweight='bold')
-    
-    st.pyplot(fig)
-    plt.close()
 
-def generar_seccion_temporal(lang: str, df):
+def figura_minutos(lang: str, df_minutos):
+    return px.box(
+        df_minutos, 
+        x='Acción', 
+        y='Minuto',
+        color='Equipo', 
+        title=get_text(lang, "time_distribution"),
+        points="all"
+    )
+
+def figura_minutos_grande(lang: str, df_resumen, df_muestra):
+    """Versión para muchos eventos: cajas con los cuartiles ya calculados y una muestra
+    de puntos en WebGL. Cada caja y sus puntos van en la misma posición numérica
+    (acción + desplazamiento por equipo), como hace px.box al agrupar por color."""
+    acciones = list(dict.fromkeys(df_resumen['Acción']))
+    equipos = list(dict.fromkeys(df_resumen['Equipo']))
+    ancho = 0.8 / max(len(equipos), 1)
+    posicion_accion = {accion: i for i, accion in enumerate(acciones)}
+    rng = np.random.default_rng(0)  # jitter fijo: la misma figura para la misma clave
+
+    fig = go.Figure()
+    for j, equipo in enumerate(equipos):
+        color = px.colors.qualitative.Plotly[j % len(px.colors.qualitative.Plotly)]
+        desplazamiento = (j - (len(equipos) - 1) / 2) * ancho
+        resumen = df_resumen[df_resumen['Equipo'] == equipo]
+        fig.add_trace(go.Box(
+            x=resumen['Acción'].map(posicion_accion) + desplazamiento,
+            q1=resumen['q1'], median=resumen['mediana'], q3=resumen['q3'],
+            lowerfence=resumen['inferior'], upperfence=resumen['superior'],
+            width=ancho * 0.9, name=str(equipo), legendgroup=str(equipo),
+            marker_color=color, boxpoints=False
+        ))
+        muestra = df_muestra[df_muestra['Equipo'] == equipo]
+        fig.add_trace(go.Scattergl(
+            x=muestra['Acción'].map(posicion_accion) + desplazamiento + rng.uniform(-0.3, 0.3, len(muestra)) * ancho,
+            y=muestra['Minuto'], mode='markers', name=str(equipo), legendgroup=str(equipo),
+            showlegend=False, marker=dict(color=color, size=3, opacity=0.4), hoverinfo='y'
+        ))
+    fig.update_layout(
+        title=get_text(lang, "time_distribution"),
+        xaxis=dict(title='Acción', tickvals=list(range(len(acciones))), ticktext=acciones),
+        yaxis_title='Minuto', legend_title_text='Equipo'
+    )
+    return fig
+
+@instrumentar("analytics.render.temporal")
+def generar_seccion_temporal(lang: str, figuras: dict):
     st.header(get_text(lang, "temporal_evolution"))
     col1, col2 = st.columns(2)
     
     with col1:
-        fig = px.histogram(
-            df, 
-            x='Jornada', 
-            color='Periodo',
-            title=get_text(lang, "actions_by_round"),
-            labels={'count': get_text(lang, "actions")}
-        )
-        st.plotly_chart(fig, use_container_width=True)
+        mostrar_figura(figuras['jornada'])
         
     with col2:
-        fig = px.box(
-            df, 
-            x='Acción', 
-            y='Minuto',
-            color='Equipo', 
-            title=get_text(lang, "time_distribution"),
-            points="all"
+        mostrar_figura(figuras['minutos'])
+
+def figura_efectividad(lang: str, df_efectividad, grande: bool = False):
+    if grande or len(df_efectividad) > MAX_TRAZAS_EFECTIVIDAD:
+        return figura_efectividad_grande(lang, df_efectividad)
+    fig = px.scatter(
+        df_efectividad, 
+        x='Acciones', 
+        y='Goles',
+        size='Goles', 
+        color='Ejecutor',
+        title=get_text(lang, "actions_goals_relation")
+    )
+    fig.update_traces(marker=dict(line=dict(width=1, color='black')))
+    fig.update_layout(plot_bgcolor='#F9F9F9', paper_bgcolor='#F9F9F9')
+    return fig
+
+def figura_efectividad_grande(lang: str, df_efectividad):
+    # Una sola traza WebGL (un punto por ejecutor, ya agregado en el servidor) con el nombre
+    # en el hover, en vez de una traza SVG y una entrada de leyenda por ejecutor
+    df = df_efectividad.nlargest(MAX_PUNTOS, 'Acciones')
+    fig = go.Figure(go.Scattergl(
+        x=df['Acciones'], y=df['Goles'], mode='markers',
+        hovertext=df['Ejecutor'].astype(str),
+        hovertemplate='<b>%{hovertext}</b><br>Acciones: %{x}<br>Goles: %{y}<extra></extra>',
+        marker=dict(
+            size=6 + 14 * df['Goles'] / max(df['Goles'].max(), 1), color=df['Goles'],
+            colorscale='Viridis', line=dict(width=1, color='black')
         )
-        st.plotly_chart(fig, use_container_width=True)
+    ))
+    fig.update_layout(
+        title=get_text(lang, "actions_goals_relation"), xaxis_title='Acciones', yaxis_title='Goles',
+        plot_bgcolor='#F9F9F9', paper_bgcolor='#F9F9F9'
+    )
+    return fig
 
-def generar_seccion_efectividad(lang: str, df):
+def figura_composicion(lang: str, df_sunburst):
+    fig = px.sunburst(
+        df_sunburst,
+        path=['Acción', 'Resultado'],
+        values='Cantidad',
+        title=get_text(lang, "results_composition"),
+        branchvalues='total',
+        custom_data=['Cantidad', 'Porcentaje']
+    )
+    fig.update_traces(
+        hovertemplate=f'<b>%{{label}}</b><br>{get_text(lang, "quantity")}: %{{customdata[0]}}<br>{get_text(lang, "percentage")}: %{{customdata[1]:.1f}}%<extra></extra>'
+    )
+    return fig
+
+@instrumentar("analytics.render.efectividad")
+def generar_seccion_efectividad(lang: str, figuras: dict):
     st.header(get_text(lang, "effectiveness_section"))
     col1, col2 = st.columns(2)
     
     with col1:
-        df_efectividad = df.groupby('Ejecutor').agg(
-            Acciones=('Ejecutor', 'count'),
-            Goles=('Gol', lambda x: (x == get_text(lang, 'yes')).sum())
-        ).reset_index()
-
-        fig = px.scatter(
-            df_efectividad, 
-            x='Acciones', 
-            y='Goles',
-            size='Goles', 
-            color='Ejecutor',
-            title=get_text(lang, "actions_goals_relation")
-        )
-        fig.update_traces(marker=dict(line=dict(width=1, color='black')))
-        fig.update_layout(plot_bgcolor='#F9F9F9', paper_bgcolor='#F9F9F9')
-        st.plotly_chart(fig, use_container_width=True)
+        mostrar_figura(figuras['efectividad'])
     
     with col2:
-        df_sun = df.groupby(['Acción', 'Resultado']).size().reset_index(name='Cantidad')
-        df_sun = df_sun[df_sun['Resultado'].notna()]
-
-        total = df_sun['Cantidad'].sum()
-        df_sun['Porcentaje'] = df_sun['Cantidad'] / total * 100
-
-        df_accion = df_sun.groupby('Acción')['Cantidad'].sum().reset_index()
-        df_accion['Resultado'] = get_text(lang, "total")
-        df_accion['Porcentaje'] = df_accion['Cantidad'] / total * 100
-
-        df_sunburst = pd.concat([df_sun, df_accion], ignore_index=True)
-        df_sunburst['Porcentaje'] = df_sunburst['Porcentaje'].fillna(0)
-
-        fig = px.sunburst(
-            df_sunburst,
-            path=['Acción', 'Resultado'],
-            values='Cantidad',
-            title=get_text(lang, "results_composition"),
-            branchvalues='total',
-            custom_data=['Cantidad', 'Porcentaje']
-        )
-        fig.update_traces(
-            hovertemplate=f'<b>%{{label}}</b><br>{get_text(lang, "quantity")}: %{{customdata[0]}}<br>{get_text(lang, "percentage")}: %{{customdata[1]:.1f}}%<extra></extra>'
-        )
-        st.plotly_chart(fig, use_container_width=True)
-
-def mostrar_ranking_parte_cuerpo(lang: str, df):
-    st.header(get_text(lang, "body_part_ranking"))
-    
-    # Definir acciones ofensivas usando claves de traducción
-    ACCIONES_OFENSIVAS = [
-        get_text(lang, "corner"),
-        get_text(lang, "free_kick"),
-        get_text(lang, "throw_in"),
-        get_text(lang, "penalty"),
-        get_text(lang, "cross"),
-        get_text(lang, "shot")
-    ]
-    
-    df['Tipo Acción'] = df['Acción'].apply(
-        lambda x: get_text(lang, "offensive") if x in ACCIONES_OFENSIVAS else get_text(lang, "defensive")
-    )
+        mostrar_figura(figuras['composicion'])
 
+def figura_ranking(lang: str, tipo: str, df_ranking, orden: list):
     color_map = {
         get_text(lang, "head"): '#00C2A0',
         get_text(lang, "leg"): '#FF5A5F',
         get_text(lang, "other"): '#4B4B4B'
     }
+    fig = px.bar(
+        df_ranking,
+        x='Cantidad',
+        y='Ejecutor',
+        color='Parte Cuerpo',
+        orientation='h',
+        text='Cantidad',
+        title=get_text(lang, "players_actions_by_body").format(tipo=tipo),
+        labels={'Cantidad': get_text(lang, "actions"), 'Ejecutor': get_text(lang, "player")},
+        color_discrete_map=color_map,
+        category_orders={'Ejecutor': orden}
+    )
+    fig.update_layout(barmode='stack')
+    return fig
 
-    for tipo in [get_text(lang, "offensive"), get_text(lang, "defensive")]:
-        df_tipo = df[(df['Tipo Acción'] == tipo) & (df['Parte Cuerpo'].notna())]
-        df_ranking = df_tipo.groupby(['Ejecutor', 'Parte Cuerpo']).size().reset_index(name='Cantidad')
-        
-        total_jugadores = df_ranking.groupby('Ejecutor')['Cantidad'].sum().sort_values(ascending=False)
-        df_ranking['Ejecutor'] = pd.Categorical(
-            df_ranking['Ejecutor'], 
-            categories=total_jugadores.index, 
-            ordered=True
-        )
+@instrumentar("analytics.render.ranking")
+def mostrar_ranking_parte_cuerpo(lang: str, figuras: dict):
+    st.header(get_text(lang, "body_part_ranking"))
 
-        st.subheader(f"{'⚔️' if tipo == get_text(lang, "offensive") else '🛡️'} {tipo} {get_text(lang, "actions")}")
-
-        fig = px.bar(
-            df_ranking,
-            x='Cantidad',
-            y='Ejecutor',
-            color='Parte Cuerpo',
-            orientation='h',
-            text='Cantidad',
-            title=get_text(lang, "players_actions_by_body").format(tipo=tipo),
-            labels={'Cantidad': get_text(lang, "actions"), 'Ejecutor': get_text(lang, "player")},
-            color_discrete_map=color_map,
-            category_orders={'Ejecutor': total_jugadores.index.tolist()}
-        )
-        fig.update_layout(barmode='stack')
-        st.plotly_chart(fig, use_container_width=True)
+    for tipo, futuro in figuras['ranking']:
+        st.subheader(f"{'⚔️' if tipo == get_text(lang, 'offensive') else '🛡️'} {tipo} {get_text(lang, 'actions')}")
+        mostrar_figura(futuro)
 
-def configurar_descarga(lang: str, df):
+@instrumentar("analytics.render.descarga")
+def configurar_descarga(lang: str, df, clave: tuple, figuras: dict):
     st.divider()
-    csv = df.to_csv(index=False).encode('utf-8')
-    st.download_button(
-        get_text(lang, "export_data"),
-        data=csv,
-        file_name="analisis_tactico.csv",
-        mime="text/csv",
-        help=get_text(lang, "export_data_help")
+    st.subheader(get_text(lang, "export_data"), help=get_text(lang, "export_data_help"))
+    mapas = {"mapa_saque.png": figuras['mapa_saque'], "mapa_remate.png": figuras['mapa_remate']}
+    mostrar_exportacion(
+        lang, clave, df, "analisis_tactico",
+        imagenes=lambda: {archivo: futuro.result() for archivo, futuro in mapas.items() if futuro is not None},
+        key="analytics_exportar"
     )
 
     # --- Footer signature ---
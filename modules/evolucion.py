@@ -1,43 +1,41 @@
 import streamlit as st
-import pandas as pd
 import plotly.graph_objects as go
+from utils.esquema import describir
+from utils.i18n import get_text
+from utils.season_stats import cargar_temporadas, libros_leidos
+from utils.instrumentacion import medir
 
 def evolucion_page(lang):
     st.markdown("<h1 style='text-align: center;'>📈 PPDA Evolution by Round</h1>", unsafe_allow_html=True)
     st.markdown("<p style='text-align: center; font-size: 16px; color: gray;'>Analyze pressure intensity trends between past and current seasons</p>", unsafe_allow_html=True)
 
-    # Load data
+    # Load data (every Cavalry<year>stats.xlsx, validated once and served from the binary cache)
     try:
-        df_2024 = pd.read_excel("Cavalry2024stats.xlsx")
-        df_2025 = pd.read_excel("Cavalry2025stats.xlsx")
+        with medir("evolucion.cargar", fallos=libros_leidos) as medida:
+            temporadas = cargar_temporadas()
+            medida["filas"] = sum(len(df) for df in temporadas.values())
     except Exception as e:
         st.error(f"Error loading files: {str(e)}")
         return
 
-    # ========== CORRECCIONES CLAVE ==========
-    # 1. Validación mejorada de columnas
-    required_cols = {
-        "Round": "categorical",
-        "Match": "categorical",
-        "PPDA": "numeric",
-        "PPDA 1st Half": "numeric",
-        "PPDA 2nd Half": "numeric"
-    }
+    if len(temporadas) < 2:
+        st.error(get_text(lang, "need_two_seasons"))
+        return
 
-    for df, year in [(df_2024, "2024"), (df_2025, "2025")]:
-        for col, dtype in required_cols.items():
-            if col not in df.columns:
-                st.error(f"Columna faltante: '{col}' en {year}.")
-                return
-            if dtype == "numeric" and not pd.api.types.is_numeric_dtype(df[col]):
-                st.error(f"Error de formato: '{col}' en {year} debe contener números.")
-                return
+    # Temporada actual = la más reciente; la de referencia se elige entre las anteriores
+    years = list(temporadas)
+    year_curr = years[-1]
+    year_prev = st.selectbox("Reference season", years[:-1][::-1], index=0)
+    df_prev = temporadas[year_prev]
+    df_curr = temporadas[year_curr]
 
-    # 2. Normalizar formato de rondas
-    for df in [df_2024, df_2025]:
-        df["Round"] = df["Round"].astype(str).str.replace(r"(\D)(\d)", r"\1 \2", regex=True).str.strip()
+    # Columnas, tipos y formato de rondas ya validados al cargar (utils.esquema.ESQUEMA_TEMPORADAS);
+    # los valores que no encajaron quedaron vacíos y se avisan aquí
+    for df, year in [(df_prev, year_prev), (df_curr, year_curr)]:
+        for violacion in df.attrs.get("violaciones", []):
+            st.warning(f"{year}: {describir(violacion)}")
 
-    # 3. Ordenamiento numérico de rondas
+    # Ordenamiento numérico de rondas
     def sort_rounds(rounds):
         def custom_key(round_str):
             try:
@@ -50,18 +48,18 @@ def evolucion_page(lang):
         return sorted(rounds, key=custom_key)
 
     # --- KPI Benchmarks ---
-    st.markdown("""
+    st.markdown(f"""
     <div style='background-color:#f5f5f5; padding: 20px; border-radius: 10px; margin-bottom: 20px;'>
-        <h4 style='margin-bottom: 10px;'>📊 <span style='color:#C8102E;'>2024 Season Averages</span></h4>
+        <h4 style='margin-bottom: 10px;'>📊 <span style='color:#C8102E;'>{year_prev} Season Averages</span></h4>
     """, unsafe_allow_html=True)
 
     col1, col2, col3 = st.columns(3)
     with col1:
-        st.metric("xG", round(df_2024['xG'].mean(), 2) if 'xG' in df_2024.columns else "N/A")
+        st.metric("xG", round(df_prev['xG'].mean(), 2) if 'xG' in df_prev.columns else "N/A")
     with col2:
-        st.metric("PPDA", round(df_2024['PPDA'].mean(), 2))
+        st.metric("PPDA", round(df_prev['PPDA'].mean(), 2))
     with col3:
-        st.metric("Possession", f"{round(df_2024['Possession, %'].mean(), 1)}%" if 'Possession, %' in df_2024.columns else "N/A")
+        st.metric("Possession", f"{round(df_prev['Possession, %'].mean(), 1)}%" if 'Possession, %' in df_prev.columns else "N/A")
 
     st.markdown("</div>", unsafe_allow_html=True)
 
@@ -76,24 +74,24 @@ def evolucion_page(lang):
     }
     selected_ppda_col = ppda_col_map[ppda_compare_option]
 
-    # --- Select match from 2024 ---
-    st.markdown("### 🔙 Select from 2024 season")
-    round_2024 = st.selectbox("Round (2024)", sort_rounds(df_2024["Round"].unique()))
-    matches_2024 = df_2024[df_2024["Round"] == round_2024]
-    match_2024 = st.selectbox("Match (2024)", matches_2024["Match"].tolist())
+    # --- Select match from reference season ---
+    st.markdown(f"### 🔙 Select from {year_prev} season")
+    round_prev = st.selectbox(f"Round ({year_prev})", sort_rounds(df_prev["Round"].unique()))
+    matches_prev = df_prev[df_prev["Round"] == round_prev]
+    match_prev = st.selectbox(f"Match ({year_prev})", matches_prev["Match"].tolist())
 
-    # --- Select match from 2025 ---
-    st.markdown("### 🔜 Select from current season (2025)")
-    round_2025 = st.selectbox("Round (2025)", sort_rounds(df_2025["Round"].unique()))
-    matches_2025 = df_2025[df_2025["Round"] == round_2025]
-    match_2025 = st.selectbox("Match (2025)", matches_2025["Match"].tolist())
+    # --- Select match from current season ---
+    st.markdown(f"### 🔜 Select from current season ({year_curr})")
+    round_curr = st.selectbox(f"Round ({year_curr})", sort_rounds(df_curr["Round"].unique()))
+    matches_curr = df_curr[df_curr["Round"] == round_curr]
+    match_curr = st.selectbox(f"Match ({year_curr})", matches_curr["Match"].tolist())
 
     # --- Extract values ---
     try:
         # 4. Extracción robusta con iloc
-        val_2024 = matches_2024[matches_2024["Match"] == match_2024][selected_ppda_col].iloc[0]
-        val_2025 = matches_2025[matches_2025["Match"] == match_2025][selected_ppda_col].iloc[0]
-        avg_2024 = df_2024[selected_ppda_col].mean()
+        val_prev = matches_prev[matches_prev["Match"] == match_prev][selected_ppda_col].iloc[0]
+        val_curr = matches_curr[matches_curr["Match"] == match_curr][selected_ppda_col].iloc[0]
+        avg_prev = df_prev[selected_ppda_col].mean()
     except Exception as e:
         st.error(f"Error al extraer valores: {str(e)}")
         return
@@ -101,38 +99,38 @@ def evolucion_page(lang):
     # --- Show comparison ---
     col1, col2, col3 = st.columns(3)
     with col1:
-        st.metric(f"{match_2024} (2024)", round(val_2024, 2))
+        st.metric(f"{match_prev} ({year_prev})", round(val_prev, 2))
     with col2:
-        st.metric(f"{match_2025} (2025)", round(val_2025, 2))
+        st.metric(f"{match_curr} ({year_curr})", round(val_curr, 2))
     with col3:
-        st.metric("Difference", f"{(val_2025 - val_2024):+.2f}")
+        st.metric("Difference", f"{(val_curr - val_prev):+.2f}")
 
     # --- Plotly bar chart ---
     fig = go.Figure()
 
     fig.add_trace(go.Bar(
         x=["PPDA"],
-        y=[val_2024],
-        name=f"{match_2024} (2024)",
-        text=[f"<b>{val_2024:.2f}</b>"],
+        y=[val_prev],
+        name=f"{match_prev} ({year_prev})",
+        text=[f"<b>{val_prev:.2f}</b>"],
         textposition='outside',
         marker_color="#C8102E"
     ))
 
     fig.add_trace(go.Bar(
         x=["PPDA"],
-        y=[val_2025],
-        name=f"{match_2025} (2025)",
-        text=[f"<b>{val_2025:.2f}</b>"],
+        y=[val_curr],
+        name=f"{match_curr} ({year_curr})",
+        text=[f"<b>{val_curr:.2f}</b>"],
         textposition='outside',
         marker_color="#00843D"
     ))
 
     fig.add_trace(go.Bar(
         x=["PPDA"],
-        y=[avg_2024],
-        name="2024 Season Avg",
-        text=[f"<b>{avg_2024:.2f}</b>"],
+        y=[avg_prev],
+        name=f"{year_prev} Season Avg",
+        text=[f"<b>{avg_prev:.2f}</b>"],
         textposition='outside',
         marker_color="#000000"
     ))
@@ -152,63 +150,61 @@ def evolucion_page(lang):
         legend=dict(orientation="h", y=-0.25, x=0.5, xanchor='center')
     )
 
-    st.plotly_chart(fig, use_container_width=True)
+    with medir("evolucion.render.comparacion"):
+        st.plotly_chart(fig, use_container_width=True)
 
     # --- Rolling PPDA Comparison by Season ---
-    st.markdown("### 🌟 Rolling PPDA Comparison – 2024 vs 2025")
+    st.markdown(f"### 🌟 Rolling PPDA Comparison – {year_prev} vs {year_curr}")
     ppda_option = st.selectbox("Select Rolling PPDA Type", ["1st Half", "2nd Half", "Full Match (90 mins)"])
     col_selected = ppda_col_map[ppda_option]
     
     # ==== CORRECCIÓN: Usar los valores reales, no la media móvil ====
-    for df in [df_2024, df_2025]:
-        df["Date"] = pd.to_datetime(df["Date"])
-    
-    df_2024_sorted = df_2024.sort_values("Date").copy()
-    df_2024_sorted["Rolling"] = df_2024_sorted[col_selected]  # Valor real, no media
-    avg_2024 = df_2024[col_selected].mean()
+    df_prev_sorted = df_prev.sort_values("Date").copy()
+    df_prev_sorted["Rolling"] = df_prev_sorted[col_selected]  # Valor real, no media
+    avg_prev = df_prev[col_selected].mean()
     
     fig_rolling = go.Figure()
     
-    # Add 2024 trace
+    # Add reference season trace
     fig_rolling.add_trace(go.Scatter(
-        x=df_2024_sorted["Date"],
-        y=df_2024_sorted["Rolling"],  # <-- Aquí se usan los valores directos
+        x=df_prev_sorted["Date"],
+        y=df_prev_sorted["Rolling"],  # <-- Aquí se usan los valores directos
         mode='lines+markers',
-        name="2024",
+        name=str(year_prev),
         marker=dict(symbol='circle', size=8, color="#C8102E"),
         line=dict(color="#C8102E", width=2),
-        hovertemplate="<b>2024</b><br>PPDA: %{y:.2f}<br>Date: %{x|%b %d}"
+        hovertemplate=f"<b>{year_prev}</b><br>PPDA: %{{y:.2f}}<br>Date: %{{x|%b %d}}"
     ))
     
-    if len(df_2025) > 0:
-        df_2025_sorted = df_2025.sort_values("Date").copy()
-        df_2025_sorted["Rolling"] = df_2025_sorted[col_selected]  # <-- Valor real
-        avg_2025 = df_2025_sorted[col_selected].mean()
+    if len(df_curr) > 0:
+        df_curr_sorted = df_curr.sort_values("Date").copy()
+        df_curr_sorted["Rolling"] = df_curr_sorted[col_selected]  # <-- Valor real
+        avg_curr = df_curr_sorted[col_selected].mean()
     
         fig_rolling.add_trace(go.Scatter(
-            x=df_2025_sorted["Date"],
-            y=df_2025_sorted["Rolling"],  # <-- Sin media móvil
+            x=df_curr_sorted["Date"],
+            y=df_curr_sorted["Rolling"],  # <-- Sin media móvil
             mode='lines+markers',
-            name="2025",
+            name=str(year_curr),
             marker=dict(symbol='square', size=8, color="#00843D"),
             line=dict(color="#00843D", width=2),
-            hovertemplate="<b>2025</b><br>PPDA: %{y:.2f}<br>Date: %{x|%b %d}"
+            hovertemplate=f"<b>{year_curr}</b><br>PPDA: %{{y:.2f}}<br>Date: %{{x|%b %d}}"
         ))
 
         fig_rolling.add_trace(go.Scatter(
-            x=[df_2025_sorted["Date"].min(), df_2025_sorted["Date"].max()],
-            y=[avg_2025, avg_2025],
+            x=[df_curr_sorted["Date"].min(), df_curr_sorted["Date"].max()],
+            y=[avg_curr, avg_curr],
             mode='lines',
-            name="2025 Avg",
+            name=f"{year_curr} Avg",
             line=dict(color="#00843D", width=1, dash="dot"),
             showlegend=True
         ))
 
     fig_rolling.add_trace(go.Scatter(
-        x=[df_2024_sorted["Date"].min(), df_2024_sorted["Date"].max()],
-        y=[avg_2024, avg_2024],
+        x=[df_prev_sorted["Date"].min(), df_prev_sorted["Date"].max()],
+        y=[avg_prev, avg_prev],
         mode='lines',
-        name="2024 Avg",
+        name=f"{year_prev} Avg",
         line=dict(color="#C8102E", width=1, dash="dot"),
         showlegend=True
     ))
@@ -236,7 +232,8 @@ def evolucion_page(lang):
         legend=dict(orientation="h", y=-0.25, x=0.5, xanchor='center')
     )
 
-    st.plotly_chart(fig_rolling, use_container_width=True)
+    with medir("evolucion.render.rolling", filas=len(df_prev) + len(df_curr)):
+        st.plotly_chart(fig_rolling, use_container_width=True)
 
     # --- Footer signature ---
     st.markdown(
@@ -1,8 +1,8 @@
 import streamlit as st
 import pandas as pd
-import requests
-from PIL import Image
-from io import BytesIO
+from utils.esquema import ErrorEsquema, describir, validar
+from utils.image_cache import precargar
+from utils.instrumentacion import marcar_fallo, medir
 
 def heatmaps_page():
     # Configuración de página y estilos
@@ -74,14 +74,22 @@ def heatmaps_page():
 
     @st.cache_data
     def load_data():
-        df = pd.read_csv("matches.csv")
-        df["Date"] = pd.to_datetime(df["Date"], errors='coerce')
+        # Validado y tipado una vez (utils.esquema.ESQUEMA_PARTIDOS); los reruns salen de la caché
+        marcar_fallo()
+        df, violaciones = validar(pd.read_csv("matches.csv"), "partidos")
         df = df.sort_values("Date", ascending=False)
         df["Team"] = df["Team"].apply(lambda x: "Cavalry" if str(x).strip().lower() == "cavalry" else "Opponent")
-        return df.fillna(0)
+        return df.fillna(0), violaciones
 
-    df = load_data()
-    df["Round"] = df["Round"].astype(str)
+    with medir("heatmaps.cargar", cache=True) as medida:
+        try:
+            df, violaciones = load_data()
+        except ErrorEsquema as e:
+            st.error(f"matches.csv: {'; '.join(describir(v) for v in e.violaciones)}")
+            return
+        medida["filas"] = len(df)
+    for violacion in violaciones:
+        st.warning(f"matches.csv: {describir(violacion)}")
 
     # Filtros
     with st.container():
@@ -105,23 +113,24 @@ def heatmaps_page():
         st.markdown('</div>', unsafe_allow_html=True)
 
     # Aplicar filtros
-    df_filtered = df[df["Player"].astype(str) != "0"].copy()
-    df_filtered = df_filtered[df_filtered["Team"] == team_view]
+    with medir("heatmaps.filtrar", filas=len(df)):
+        df_filtered = df[df["Player"].astype(str) != "0"].copy()
+        df_filtered = df_filtered[df_filtered["Team"] == team_view]
     
-    filter_config = [
-        (round_filter, "Round"),
-        (side_filter, "Local/Visit"),
-        (opponent_filter, "Cavalry/Opponent"),
-        (date_filter, "Date"),
-        (player_filter, "Player")
-    ]
+        filter_config = [
+            (round_filter, "Round"),
+            (side_filter, "Local/Visit"),
+            (opponent_filter, "Cavalry/Opponent"),
+            (date_filter, "Date"),
+            (player_filter, "Player")
+        ]
     
-    for value, col in filter_config:
-        if value != "All":
-            if col == "Date":
-                df_filtered = df_filtered[df_filtered[col].dt.date.astype(str) == value]
-            else:
-                df_filtered = df_filtered[df_filtered[col] == value]
+        for value, col in filter_config:
+            if value != "All":
+                if col == "Date":
+                    df_filtered = df_filtered[df_filtered[col].dt.date.astype(str) == value]
+                else:
+                    df_filtered = df_filtered[df_filtered[col] == value]
 
     # Mostrar jugadores
     def get_position_order(pos):
@@ -149,14 +158,21 @@ def heatmaps_page():
     df_filtered = df_filtered.sort_values(by="Position", key=lambda x: x.apply(get_position_order))
     players_list = df_filtered["Player"].unique()
     
+    # Miniaturas locales (se descargan en paralelo solo la primera vez)
+    first_rows = df_filtered.drop_duplicates("Player").set_index("Player")
+    with medir("heatmaps.miniaturas", filas=len(first_rows)):
+        fotos = precargar(
+            (url, 70) for url in first_rows.loc[first_rows["Team"] == "Cavalry", "Photo"]
+        )
+
     cols = st.columns(6)
     for idx, player_name in enumerate(players_list):
-        player_data = df_filtered[df_filtered["Player"] == player_name].iloc[0]
+        player_data = first_rows.loc[player_name]
         with cols[idx % 6]:
             try:
                 st.markdown("<div class='player-card'>", unsafe_allow_html=True)
                 if player_data["Team"] == "Cavalry":
-                    st.image(player_data["Photo"], width=70, use_column_width=False)
+                    st.image(fotos.get((player_data["Photo"], 70)) or player_data["Photo"], width=70, use_column_width=False)
                 pos_group = get_position_group(player_data["Position"])
                 team_label = player_data['Team'] if player_data['Team'] == 'Cavalry' else f"Opponent ({player_data['Cavalry/Opponent']})"
                 st.markdown(
@@ -179,6 +195,8 @@ def heatmaps_page():
         st.divider()
         st.markdown(f"## 🔥 Heatmaps - {st.session_state.selected_player}")
         df_player = df[df["Player"] == st.session_state.selected_player].sort_values("Date", ascending=False)
+        with medir("heatmaps.mapas_jugador", filas=len(df_player)):
+            heatmaps = precargar((url, 300) for url in df_player["heatmap"])
         
         for _, row in df_player.iterrows():
             with st.expander(f"Round {row['Round']} - {row['Date'].date()}"):
@@ -198,7 +216,7 @@ def heatmaps_page():
                     st.json(stats)
                 with col2:
                     try:
-                        st.image(row["heatmap"], width=300)
+                        st.image(heatmaps.get((row["heatmap"], 300)) or row["heatmap"], width=300)
                     except:
                         st.warning(f"Could not load heatmap for Round {row['Round']}")
 
@@ -5,6 +5,7 @@ import matplotlib.pyplot as plt
 from mplsoccer import VerticalPitch
 import datetime
 from utils.i18n import get_text
+from utils.zonas import ZONAS_COORDS
 
 # Helper para opciones traducidas
 def get_localized_options(lang: str, options: list, translation_prefix: str):
@@ -37,13 +38,7 @@ def cargar_datos():
         "Pacific FC", "Valour FC", "Vancouver FC", "York United FC"
     ])
 
-    zonas_coords = {
-        1: (120, 0), 2: (120, 80), 3: (93, 9), 4: (93, 71),
-        5: (114, 30), 6: (114, 50), 7: (114, 40), 8: (111, 15),
-        9: (111, 65), 10: (105, 35), 11: (105, 45), 12: (105, 25),
-        13: (105, 55), 14: (93, 29), 15: (93, 51), 16: (72, 20),
-        17: (72, 60), "Penal": (108, 40)
-    }
+    zonas_coords = ZONAS_COORDS
     
     return jugadores, equipos, zonas_coords
 
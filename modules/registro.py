@@ -1,21 +1,29 @@
 # modules/registro.py
 import streamlit as st
-import pandas as pd
-import matplotlib.pyplot as plt
-from mplsoccer import VerticalPitch
+import numpy as np
 import datetime
 from utils.i18n import get_text
+from utils.zonas import ZONAS, ZONAS_COORDS
+from utils.densidad import acumular_zona
+from utils.render_pitch import fallos_png, heatmap_png
+from utils.instrumentacion import medir
+from utils.exportar import mostrar_exportacion
+from utils.registro_buffer import (
+    nuevo_buffer, anexar, borrar, vista, filas_vivas, ids_vivos, versiones_vivas
+)
+from utils.registro_journal import (
+    registrar_accion, eliminar_accion, leer_desde, journal_id, archivar_journal
+)
 
 # Helper para opciones traducidas
 def get_localized_options(lang: str, options: list, translation_prefix: str):
     return {opt: get_text(lang, f"{translation_prefix}_{opt}") for opt in options}
 
 def registro_page(lang: str):
-    # Inicializar registro en session_state si no existe
-    if 'registro' not in st.session_state:
-        st.session_state.registro = []
-    
     jugadores, equipos, zonas_coords = cargar_datos()
+
+    # Analista que firma las acciones (varias sesiones registran sobre el mismo partido)
+    st.text_input(get_text(lang, "analyst"), key="registro_analista")
     
     with st.form("form_registro", clear_on_submit=True):
         datos = mostrar_formulario(lang, jugadores, equipos, zonas_coords)
@@ -41,13 +49,7 @@ def cargar_datos():
         "Pacific FC", "Valour FC", "Vancouver FC", "York United FC"
     ])
 
-    zonas_coords = {
-        1: (120, 0), 2: (120, 80), 3: (93, 9), 4: (93, 71),
-        5: (114, 30), 6: (114, 50), 7: (114, 40), 8: (111, 15),
-        9: (111, 65), 10: (105, 35), 11: (105, 45), 12: (105, 25),
-        13: (105, 55), 14: (93, 29), 15: (93, 51), 16: (72, 20),
-        17: (72, 60), "Penal": (108, 40)
-    }
+    zonas_coords = ZONAS_COORDS
     
     return jugadores, equipos, zonas_coords
 
@@ -280,26 +282,87 @@ def mostrar_formulario(lang: str, jugadores, equipos, zonas):
     return datos if st.form_submit_button(get_text(lang, "register_action")) else None
 
 def procesar_registro(lang: str, datos):
-    st.session_state.registro.append(datos)
+    # Persistir primero en el registro compartido; la sesión lo lee al sincronizar
+    registrar_accion(datos, st.session_state.get("registro_analista") or None)
     st.success(get_text(lang, "registration_success"))  
 
+# Columnas de zona de los mapas de calor, en el orden de las filas de los acumuladores
+COLUMNAS_ZONA = ("Zona Saque", "Zona Remate")
+
+def conteos_equipo(equipo: str) -> np.ndarray:
+    # Acumulador (saque/remate, zonas) del equipo; se crea vacío la primera vez
+    return st.session_state.registro_conteos.setdefault(
+        equipo, np.zeros((len(COLUMNAS_ZONA), len(ZONAS)), dtype=np.int64)
+    )
+
+def acumular_evento(datos: dict, delta: int):
+    # Aporte de un solo evento a los conteos por zona de su equipo (+1 al llegar, -1 al borrarse)
+    conteos = conteos_equipo(datos["Equipo"])
+    for fila, columna in enumerate(COLUMNAS_ZONA):
+        acumular_zona(conteos[fila], datos[columna], delta)
+
+def sincronizar_registro():
+    # Aplicar al buffer de la sesión solo las filas que cambiaron desde la última versión vista
+    # (altas y lápidas de cualquier analista conectado al mismo registro)
+    jid = journal_id()
+    if st.session_state.get("registro_journal") != jid:
+        st.session_state.registro = nuevo_buffer()
+        st.session_state.registro_version = 0
+        st.session_state.registro_conteos = {}
+        st.session_state.registro_journal = jid
+
+    buffer = st.session_state.registro
+    for id_accion, version, borrado, analista, datos in leer_desde(st.session_state.registro_version):
+        if borrado:
+            datos = borrar(buffer, id_accion)
+            if datos is not None:
+                acumular_evento(datos, -1)
+        else:
+            anexar(buffer, id_accion, version, {**datos, "Analista": analista or ""})
+            acumular_evento(datos, 1)
+        st.session_state.registro_version = version
+
+def borrar_accion():
+    # Callback: corre antes de sincronizar, así el índice apunta a la fila que vio el analista.
+    # Solo borra si nadie la borró antes (se compara con la versión que ve esta sesión).
+    buffer = st.session_state.registro
+    idx = st.session_state.registro_indice_borrar
+    if idx < filas_vivas(buffer) and not eliminar_accion(
+        int(ids_vivos(buffer)[idx]), int(versiones_vivas(buffer)[idx])
+    ):
+        st.session_state.registro_conflicto = True
+
+def archivar_registro():
+    # Callback: archivar vacía la vista de todos los analistas conectados, solo con la confirmación marcada
+    if st.session_state.pop("registro_confirmar_archivo", False):
+        archivar_journal()
+
 def mostrar_datos_y_visualizaciones(lang: str, zonas):
-    if st.session_state.registro:
-        df = pd.DataFrame(st.session_state.registro)
+    with medir("registro.sincronizar") as medida:
+        sincronizar_registro()
+        medida["filas"] = filas_vivas(st.session_state.registro)
+    if filas_vivas(st.session_state.registro):
+        with medir("registro.dataframe", filas=filas_vivas(st.session_state.registro)):
+            df = vista(st.session_state.registro)
         
         col1, col2 = st.columns([3,1])
         with col1:
             st.subheader(get_text(lang, "registered_data"))
             st.dataframe(df, use_container_width=True)
         with col2:
-            index_to_delete = st.number_input(
+            st.number_input(
                 get_text(lang, "delete_index"), 
                 min_value=0, 
-                max_value=len(df)-1
+                max_value=len(df)-1,
+                key="registro_indice_borrar"
             )
-            if st.button(f"🗑️ {get_text(lang, 'delete_record')}"):
-                st.session_state.registro.pop(index_to_delete)
-                st.experimental_rerun()
+            st.button(f"🗑️ {get_text(lang, 'delete_record')}", on_click=borrar_accion)
+            if st.session_state.pop("registro_conflicto", False):
+                st.warning(get_text(lang, "delete_conflict"))
+            # El clic vuelve a correr la página, que sincroniza lo de los demás analistas
+            st.button(f"🔄 {get_text(lang, 'refresh_log')}")
+            confirmar = st.checkbox(get_text(lang, "confirm_new_log"), key="registro_confirmar_archivo")
+            st.button(f"🧹 {get_text(lang, 'new_log')}", on_click=archivar_registro, disabled=not confirmar)
 
         st.markdown(f"### {get_text(lang, 'filter_header')}")
         equipo_filtro = st.radio(
@@ -308,61 +371,62 @@ def mostrar_datos_y_visualizaciones(lang: str, zonas):
             index=0
         )
         
-        filtered_df = df[df["Equipo"] == ("Cavalry FC" if equipo_filtro == "Cavalry FC" else "Rival")]
-        generar_heatmaps(lang, filtered_df, zonas)
+        equipo = "Cavalry FC" if equipo_filtro == "Cavalry FC" else "Rival"
+        with medir("registro.filtrar", filas=len(df)):
+            filtered_df = vista(st.session_state.registro, equipo)
+        # Identifica los datos exportables: registro, última versión de fila sincronizada, equipo e
+        # idioma (títulos de los mapas del zip). La caché de exportación es compartida entre sesiones,
+        # así que la clave no puede usar el contador del buffer (es propio de cada sesión); la versión
+        # del registro es igual en todas.
+        clave = (st.session_state.registro_journal, st.session_state.registro_version, equipo, lang)
+        generar_heatmaps(lang, filtered_df, conteos_equipo(equipo), clave)
 
-def generar_heatmaps(lang: str, df, zonas):
+def generar_heatmaps(lang: str, df, conteos, clave: tuple):
+    # Los mapas salen de los acumuladores por zona del equipo, no de recorrer `df`
     try:
         if df.empty:
             st.warning(get_text(lang, "no_data_warning"))
             return
 
-        df = df.copy()
         df = df.dropna(subset=["x_saque", "y_saque", "x_remate", "y_remate"])
         
-        pitch = VerticalPitch(
-            pitch_type='statsbomb',
-            pitch_color='grass',
-            line_color='white',
-            half=True,
-            goal_type='box',
-            linewidth=1.5
-        )
-
         heatmap_params = {
-            'cmap': 'Greens',
-            'levels': 100,
-            'fill': True,
-            'alpha': 0.7,
             'bw_adjust': 0.48,
-            'thresh': 0.01,
-            'zorder': 2
+            'alpha': 0.7,
+            'thresh': 0.01
         }
 
         # Heatmap de Saques
-        fig1, ax1 = plt.subplots(figsize=(12, 8))
-        pitch.draw(ax=ax1)
-        pitch.kdeplot(df['x_saque'], df['y_saque'], ax=ax1, **heatmap_params)
-        ax1.set_title(get_text(lang, "kickoff_distribution"), fontsize=16, pad=20, fontweight='bold')
-        st.pyplot(fig1)
+        with medir("registro.heatmap.saque", filas=len(df), fallos=fallos_png):
+            png_saque = heatmap_png(
+                "registro",
+                tuple(int(c) for c in conteos[0]),
+                cmap='Greens',
+                titulo=get_text(lang, "kickoff_distribution"),
+                **heatmap_params
+            )
+            st.image(png_saque, use_column_width=True)
 
         # Heatmap de Remates
-        fig2, ax2 = plt.subplots(figsize=(12, 8))
-        pitch.draw(ax=ax2)
-        heatmap_params['cmap'] = 'Reds'
-        pitch.kdeplot(df['x_remate'], df['y_remate'], ax=ax2, **heatmap_params)
-        ax2.set_title(get_text(lang, "shot_zones"), fontsize=16, pad=20, fontweight='bold')
-        st.pyplot(fig2)
-
-        # Descargar CSV
-        csv = df.to_csv(index=False, encoding='utf-8-sig')
-        
-        st.download_button(
-            f"⬇️ {get_text(lang, 'download_csv')}",
-            csv,
-            "acciones_filtradas.csv",
-            "text/csv",
-            key='download-csv'
+        with medir("registro.heatmap.remate", filas=len(df), fallos=fallos_png):
+            png_remate = heatmap_png(
+                "registro",
+                tuple(int(c) for c in conteos[1]),
+                cmap='Reds',
+                titulo=get_text(lang, "shot_zones"),
+                **heatmap_params
+            )
+            st.image(png_remate, use_column_width=True)
+
+        # Exportar: el archivo se arma solo al pedirlo
+        mostrar_exportacion(
+            lang,
+            clave,
+            df,
+            "acciones_filtradas",
+            imagenes=lambda: {"mapa_saque.png": png_saque, "mapa_remate.png": png_remate},
+            encoding="utf-8-sig",
+            key="registro_exportar"
         )
 
     except Exception as e:
@@ -0,0 +1,73 @@
+"""Versiones estáticas (matplotlib) de los gráficos de Plotly del panel analítico."""
+import io
+
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+from matplotlib.ticker import MaxNLocator
+import pandas as pd
+
+FIGSIZE = (10, 7)
+DPI = 100
+COLOR_OTRO = '#9E9E9E'
+
+
+def _png(fig) -> bytes:
+    buffer = io.BytesIO()
+    try:
+        fig.savefig(buffer, format='png', bbox_inches='tight', pil_kwargs={'compress_level': 1})
+    finally:
+        plt.close(fig)
+    return buffer.getvalue()
+
+
+def efectividad_png(df_efectividad: pd.DataFrame, por: str, titulo: str) -> bytes:
+    """Acciones vs goles por `por` (ejecutor o partido), como el scatter del panel."""
+    fig, ax = plt.subplots(figsize=FIGSIZE, dpi=DPI)
+    colores = plt.get_cmap('tab10')
+    for i, fila in enumerate(df_efectividad.to_dict('records')):
+        ax.scatter(
+            fila['Acciones'], fila['Goles'],
+            s=60 + 120 * fila['Goles'],
+            color=colores(i % 10),
+            edgecolors='black',
+            linewidths=1,
+            zorder=2
+        )
+        ax.annotate(str(fila[por]), (fila['Acciones'], fila['Goles']),
+                    textcoords='offset points', xytext=(6, 6), fontsize=9)
+    ax.set_xlabel('Acciones')
+    ax.set_ylabel('Goles')
+    # Conteos: ejes enteros y un margen para que los goles = 0 no queden en el borde
+    ax.xaxis.set_major_locator(MaxNLocator(integer=True))
+    ax.yaxis.set_major_locator(MaxNLocator(integer=True))
+    ax.set_ylim(-0.5, max(1, df_efectividad['Goles'].max()) + 0.5)
+    ax.set_facecolor('#F9F9F9')
+    ax.grid(True, color='white', zorder=1)
+    ax.set_title(titulo, fontsize=14, fontweight='bold')
+    return _png(fig)
+
+
+def ranking_png(df_ranking: pd.DataFrame, orden: list, titulo: str, colores: dict, etiqueta_x: str) -> bytes:
+    """Barras horizontales apiladas por parte del cuerpo, jugador con más acciones arriba."""
+    tabla = (
+        df_ranking.pivot_table(
+            index='Ejecutor', columns='Parte Cuerpo', values='Cantidad',
+            aggfunc='sum', fill_value=0, observed=True
+        )
+        .reindex(orden, fill_value=0)
+    )
+    alto = max(3, 0.45 * len(tabla) + 1.5)
+    fig, ax = plt.subplots(figsize=(FIGSIZE[0], alto), dpi=DPI)
+    izquierda = pd.Series(0, index=tabla.index)
+    for parte in tabla.columns:
+        ax.barh(
+            tabla.index.astype(str), tabla[parte], left=izquierda,
+            color=colores.get(parte, COLOR_OTRO), label=str(parte)
+        )
+        izquierda = izquierda + tabla[parte]
+    ax.invert_yaxis()
+    ax.set_xlabel(etiqueta_x)
+    ax.legend(loc='lower right')
+    ax.set_title(titulo, fontsize=14, fontweight='bold')
+    return _png(fig)
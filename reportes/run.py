@@ -0,0 +1,221 @@
+"""Reportes por partido y por ejecutor: mapas de calor, efectividad y ranking por parte del cuerpo.
+
+Uso (desde la raíz del repo):
+
+    python -m reportes.run                         # todos los partidos y ejecutores, PNG + PDF
+    python -m reportes.run --lang en --procesos 4
+    python -m reportes.run --csv otro_master.csv --salida /tmp/reportes --sin-pdf
+
+Cada artefacto guarda en `indice.json` una huella de sus datos de entrada;
+si no cambió y el archivo sigue en disco, no se vuelve a renderizar.
+"""
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+import time
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import pandas as pd
+from PIL import Image
+
+from modules.analytics import preparar_eventos
+from reportes import graficos
+from utils import consultas, render_pitch
+from utils.densidad import conteo_zonas
+from utils.esquema import describir, validar
+from utils.event_store import cargar_eventos
+from utils.filtros import etiqueta_partido
+from utils.i18n import get_text
+from utils.paralelo import NUCLEOS
+
+SALIDA_DIR = Path(__file__).resolve().parent / "salida"
+# Subir al cambiar cómo se dibuja algo: invalida todas las huellas
+VERSION_RENDER = 1
+
+
+def _slug(texto: str) -> str:
+    ascii_ = unicodedata.normalize("NFKD", str(texto)).encode("ascii", "ignore").decode()
+    return re.sub(r"[^0-9A-Za-z]+", "-", ascii_).strip("-").lower() or "sin-nombre"
+
+
+def _huella(*partes) -> str:
+    h = hashlib.sha1(str(VERSION_RENDER).encode())
+    for parte in partes:
+        h.update(parte.to_csv(index=False).encode() if isinstance(parte, pd.DataFrame) else repr(parte).encode())
+    return h.hexdigest()
+
+
+def _artefactos(lang: str, df: pd.DataFrame, titulo: str, por: str) -> list:
+    """Artefactos de una unidad (partido o ejecutor): archivo, cómo renderizarlo y huella de sus datos."""
+    artefactos = []
+    for tipo, columna, cmap in [('saque', 'Zona Saque', 'Greens'), ('remate', 'Zona Remate', 'Reds')]:
+        conteos = tuple(int(c) for c in conteo_zonas(df[columna]))
+        if sum(conteos) == 0:
+            continue
+        params = {
+            'bw_adjust': 0.65, 'cmap': cmap, 'alpha': 0.75,
+            'titulo': f"{titulo} · {get_text(lang, 'density_title').format(tipo=get_text(lang, tipo))}",
+        }
+        artefactos.append({
+            "archivo": f"mapa_{tipo}.png", "render": "heatmap",
+            "args": ("analytics", conteos, params), "huella": _huella(conteos, params),
+        })
+
+    df_efectividad = consultas.efectividad_ejecutor(df, get_text(lang, 'yes'), por=por)
+    titulo_efectividad = f"{titulo} · {get_text(lang, 'actions_goals_relation')}"
+    artefactos.append({
+        "archivo": "efectividad.png", "render": "efectividad",
+        "args": (df_efectividad, por, titulo_efectividad),
+        "huella": _huella(df_efectividad, por, titulo_efectividad),
+    })
+
+    acciones_ofensivas = [
+        get_text(lang, clave) for clave in ("corner", "free_kick", "throw_in", "penalty", "cross", "shot")
+    ]
+    colores = {
+        get_text(lang, "head"): '#00C2A0',
+        get_text(lang, "leg"): '#FF5A5F',
+        get_text(lang, "other"): '#4B4B4B'
+    }
+    rankings = consultas.ranking_parte_cuerpo(
+        df, acciones_ofensivas, get_text(lang, "offensive"), get_text(lang, "defensive")
+    )
+    for (tipo, df_ranking, orden), sufijo in zip(rankings, ("ofensivo", "defensivo")):
+        if df_ranking.empty:
+            continue
+        titulo_ranking = f"{titulo} · {get_text(lang, 'players_actions_by_body').format(tipo=tipo)}"
+        artefactos.append({
+            "archivo": f"ranking_{sufijo}.png", "render": "ranking",
+            "args": (df_ranking, orden, titulo_ranking, colores, get_text(lang, "actions")),
+            "huella": _huella(df_ranking, orden, titulo_ranking),
+        })
+    return artefactos
+
+
+def planificar(lang: str, df: pd.DataFrame) -> list:
+    """Una unidad por partido (fecha + rival) y otra por ejecutor, con sus artefactos."""
+    df = df.sort_values('Fecha', kind='stable').reset_index(drop=True)
+    df['Partido'] = etiqueta_partido(df)
+    unidades = []
+    for (fecha, rival), sub in df.groupby([df['Fecha'].dt.normalize(), 'Rival'], sort=True, observed=True):
+        titulo = f"{fecha:%d %b %Y} vs {rival}"
+        unidades.append({
+            "directorio": f"partidos/{fecha:%Y-%m-%d}-{_slug(rival)}",
+            "artefactos": _artefactos(lang, sub, titulo, por='Ejecutor'),
+        })
+    for ejecutor, sub in df.groupby('Ejecutor', sort=True, observed=True):
+        unidades.append({
+            "directorio": f"ejecutores/{_slug(ejecutor)}",
+            "artefactos": _artefactos(lang, sub, str(ejecutor), por='Partido'),
+        })
+    return unidades
+
+
+def _escribir_atomico(path: Path, data: bytes):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+
+def _renderizar(artefacto: dict) -> bytes:
+    if artefacto["render"] == "heatmap":
+        estilo, conteos, params = artefacto["args"]
+        return render_pitch.renderizar_heatmap(estilo, conteos, **params)
+    if artefacto["render"] == "efectividad":
+        return graficos.efectividad_png(*artefacto["args"])
+    return graficos.ranking_png(*artefacto["args"])
+
+
+def renderizar_unidad(salida: str, directorio: str, pendientes: list, paginas: list, pdf: str) -> list:
+    """Trabajo de un proceso: escribe los PNG pendientes y, si hace falta, el PDF de la unidad.
+
+    Devuelve [(ruta relativa, huella)] de lo que escribió.
+    """
+    base = Path(salida) / directorio
+    hechos = []
+    for artefacto in pendientes:
+        _escribir_atomico(base / artefacto["archivo"], _renderizar(artefacto))
+        hechos.append((f"{directorio}/{artefacto['archivo']}", artefacto["huella"]))
+    if pdf and paginas:
+        imagenes = [Image.open(base / archivo).convert("RGB") for archivo in paginas]
+        tmp = base / f"reporte.pdf.{os.getpid()}.tmp"
+        imagenes[0].save(tmp, format="PDF", save_all=True, append_images=imagenes[1:], resolution=render_pitch.DPI)
+        os.replace(tmp, base / "reporte.pdf")
+        hechos.append((f"{directorio}/reporte.pdf", pdf))
+    return hechos
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lang", choices=["es", "en"], default="es")
+    parser.add_argument("--salida", type=Path, default=SALIDA_DIR)
+    parser.add_argument("--csv", type=Path, default=None, help="leer este CSV en vez del almacén local")
+    parser.add_argument("--procesos", type=int, default=NUCLEOS)
+    parser.add_argument("--sin-pdf", action="store_true", help="solo PNG, sin el PDF por unidad")
+    parser.add_argument("--forzar", action="store_true", help="renderizar todo aunque no haya cambiado")
+    args = parser.parse_args()
+
+    inicio = time.perf_counter()
+    if args.csv:
+        eventos, violaciones = validar(pd.read_csv(args.csv), "eventos")
+        for violacion in violaciones:
+            print(f"Aviso: {describir(violacion)}", file=sys.stderr)
+    else:
+        eventos = cargar_eventos()
+    df = preparar_eventos(args.lang, eventos)
+    if df.empty:
+        print("Sin eventos para reportar", file=sys.stderr)
+        return
+
+    indice_path = args.salida / "indice.json"
+    try:
+        indice = {} if args.forzar else json.loads(indice_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        indice = {}
+
+    tareas = []
+    omitidos = 0
+    for unidad in planificar(args.lang, df):
+        directorio = unidad["directorio"]
+        vigente = lambda ruta, huella: indice.get(ruta) == huella and (args.salida / ruta).exists()
+        pendientes = [
+            a for a in unidad["artefactos"] if not vigente(f"{directorio}/{a['archivo']}", a["huella"])
+        ]
+        omitidos += len(unidad["artefactos"]) - len(pendientes)
+        huella_pdf = "" if args.sin_pdf else _huella([a["huella"] for a in unidad["artefactos"]])
+        if huella_pdf and vigente(f"{directorio}/reporte.pdf", huella_pdf):
+            huella_pdf = ""
+        if pendientes or huella_pdf:
+            paginas = [a["archivo"] for a in unidad["artefactos"]]
+            tareas.append((str(args.salida), directorio, pendientes, paginas, huella_pdf))
+
+    print(f"{len(tareas)} unidades con cambios, {omitidos} artefactos sin cambios", file=sys.stderr)
+    escritos = 0
+    try:
+        if tareas:
+            # El fondo de la cancha se rasteriza una vez aquí y se comparte con cada proceso
+            fondos = {"analytics": render_pitch.fondo_pitch("analytics")}
+            with ProcessPoolExecutor(
+                max_workers=max(1, args.procesos),
+                initializer=render_pitch.instalar_fondos,
+                initargs=(fondos,)
+            ) as pool:
+                futuros = [pool.submit(renderizar_unidad, *tarea) for tarea in tareas]
+                for futuro in as_completed(futuros):
+                    for ruta, huella in futuro.result():
+                        indice[ruta] = huella
+                        escritos += 1
+    finally:
+        _escribir_atomico(indice_path, json.dumps(indice, indent=2, ensure_ascii=False).encode("utf-8"))
+
+    print(f"{escritos} archivos escritos en {args.salida} ({time.perf_counter() - inicio:.1f} s)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+"""Protocolo de ingesta incremental del almacén (offset en bytes + huella de la última fila)."""
+import hashlib
+import threading
+import time
+
+import pytest
+import requests
+
+from utils import event_store
+
+CLUB = "Cavalry FC"
+LINEAS = event_store.LOCAL_CSV.read_bytes().splitlines(keepends=True)
+ENCABEZADO, FILAS = LINEAS[0], LINEAS[1:]
+
+
+def _csv(filas) -> bytes:
+    return ENCABEZADO + b"".join(filas)
+
+
+class Respuesta:
+    def __init__(self, status_code: int, content: bytes = b"", etag: str = None):
+        self.status_code = status_code
+        self.content = content
+        self.headers = {"ETag": etag} if etag else {}
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(str(self.status_code))
+
+
+class Servidor:
+    """GitHub de mentira: ETag por contenido, Range opcional y registro de los pedidos."""
+
+    def __init__(self, contenido: bytes, rangos: bool = True):
+        self.contenido = contenido
+        self.rangos = rangos
+        self.pedidos = []
+        self.demora = 0
+
+    def get(self, url, headers=None, timeout=None):
+        headers = headers or {}
+        self.pedidos.append(headers)
+        time.sleep(self.demora)
+        etag = hashlib.sha1(self.contenido).hexdigest()
+        if headers.get("If-None-Match") == etag:
+            return Respuesta(304)
+        rango = headers.get("Range")
+        if rango and self.rangos:
+            inicio = int(rango.removeprefix("bytes=").rstrip("-"))
+            if inicio >= len(self.contenido):
+                return Respuesta(416)
+            return Respuesta(206, self.contenido[inicio:], etag)
+        return Respuesta(200, self.contenido, etag)
+
+
+@pytest.fixture
+def servidor(tmp_path, monkeypatch):
+    monkeypatch.setattr(event_store, "CACHE_DIR", tmp_path)
+    monkeypatch.setattr(event_store, "PARTICIONES_DIR", tmp_path / "eventos")
+    monkeypatch.setattr(event_store, "MANIFIESTO_PATH", tmp_path / "particiones.json")
+    monkeypatch.setattr(event_store, "SEMILLAS", {})
+    monkeypatch.setattr(event_store, "_memoria", {})
+    servidor = Servidor(_csv(FILAS[:20]))
+    monkeypatch.setattr(event_store.requests, "get", servidor.get)
+    assert event_store.refrescar_store(CLUB, forzar=True)
+    return servidor
+
+
+def _meta() -> dict:
+    return event_store._leer_json(event_store._meta_path(CLUB))
+
+
+def _filas() -> int:
+    return sum(p["filas"] for p in event_store._leer_json(event_store.MANIFIESTO_PATH)["particiones"])
+
+
+def _partes() -> list:
+    return [parte for p in event_store._leer_json(event_store.MANIFIESTO_PATH)["particiones"] for parte in p["partes"]]
+
+
+def test_carga_inicial(servidor):
+    assert "Range" not in servidor.pedidos[0]
+    meta = _meta()
+    assert meta["bytes"] == len(servidor.contenido)
+    assert meta["largo_fila"] == len(FILAS[19])
+    assert meta["version"] == hashlib.sha1(servidor.contenido).hexdigest()
+    assert _filas() == len(event_store.cargar_eventos()) == 20
+
+
+def test_sin_cambios_304(servidor):
+    version = event_store.version_store()
+    assert not event_store.refrescar_store(CLUB, forzar=True)
+    assert servidor.pedidos[-1]["Range"] == f"bytes={len(servidor.contenido) - len(FILAS[19])}-"
+    assert event_store.version_store() == version
+
+
+def test_206_anexa_solo_la_cola(servidor):
+    previas = set(_partes())
+    servidor.contenido = _csv(FILAS[:30])
+    assert event_store.refrescar_store(CLUB, forzar=True)
+    assert len(servidor.pedidos) == 2
+    assert previas < set(_partes())
+    meta = _meta()
+    assert meta["bytes"] == len(servidor.contenido)
+    assert meta["hash_fila"] == hashlib.sha1(FILAS[29]).hexdigest()
+    # Versión encadenada, no el hash del archivo completo
+    assert meta["version"] != hashlib.sha1(servidor.contenido).hexdigest()
+    assert _filas() == len(event_store.cargar_eventos()) == 30
+
+
+def test_206_anexa_dos_veces(servidor):
+    servidor.contenido = _csv(FILAS[:25])
+    assert event_store.refrescar_store(CLUB, forzar=True)
+    servidor.contenido = _csv(FILAS[:30])
+    assert event_store.refrescar_store(CLUB, forzar=True)
+    assert servidor.pedidos[-1]["Range"] == f"bytes={len(_csv(FILAS[:25])) - len(FILAS[24])}-"
+    assert _filas() == len(event_store.cargar_eventos()) == 30
+
+
+def test_416_recarga_completa(servidor):
+    servidor.contenido = _csv(FILAS[:5])
+    assert event_store.refrescar_store(CLUB, forzar=True)
+    assert "Range" not in servidor.pedidos[-1]
+    assert _meta()["version"] == hashlib.sha1(servidor.contenido).hexdigest()
+    assert _filas() == len(event_store.cargar_eventos()) == 5
+
+
+def test_200_sin_rangos_parsea_la_cola(servidor):
+    servidor.rangos = False
+    servidor.contenido = _csv(FILAS[:30])
+    assert event_store.refrescar_store(CLUB, forzar=True)
+    assert len(servidor.pedidos) == 2
+    assert _meta()["version"] != hashlib.sha1(servidor.contenido).hexdigest()
+    assert _filas() == len(event_store.cargar_eventos()) == 30
+
+
+def test_ultima_fila_cambiada_recarga_completa(servidor):
+    # Misma longitud y otro contenido: solo la huella lo detecta
+    editada = FILAS[19].replace(b",40,", b",41,", 1)
+    assert editada != FILAS[19] and len(editada) == len(FILAS[19])
+    servidor.contenido = _csv(FILAS[:19] + [editada] + FILAS[20:30])
+    assert event_store.refrescar_store(CLUB, forzar=True)
+    assert "Range" in servidor.pedidos[1] and "Range" not in servidor.pedidos[2]
+    assert _meta()["version"] == hashlib.sha1(servidor.contenido).hexdigest()
+    assert _filas() == len(event_store.cargar_eventos()) == 30
+
+
+def test_206_mas_corto_que_la_ultima_fila(servidor):
+    # El archivo se reescribió sin el salto de línea final: la cola no alcanza la huella
+    servidor.contenido = servidor.contenido[:-2]
+    assert event_store.refrescar_store(CLUB, forzar=True)
+    assert "Range" not in servidor.pedidos[-1]
+    assert _meta()["version"] == hashlib.sha1(servidor.contenido).hexdigest()
+    assert _filas() == len(event_store.cargar_eventos()) == 20
+
+
+def test_200_mas_corto_que_el_offset(servidor):
+    servidor.rangos = False
+    servidor.contenido = _csv(FILAS[:12])
+    assert event_store.refrescar_store(CLUB, forzar=True)
+    assert len(servidor.pedidos) == 2
+    assert _meta()["version"] == hashlib.sha1(servidor.contenido).hexdigest()
+    assert _filas() == len(event_store.cargar_eventos()) == 12
+
+
+def test_refrescos_concurrentes_anexan_una_vez(servidor):
+    # Varias sesiones revalidan a la vez después de que el CSV creció 10 filas
+    servidor.contenido = _csv(FILAS[:30])
+    servidor.demora = 0.05
+    resultados = []
+    hilos = [
+        threading.Thread(target=lambda: resultados.append(event_store.refrescar_store(CLUB, forzar=True)))
+        for _ in range(4)
+    ]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    # Una sola ingesta de la cola; las demás sesiones ya piden con el ETag nuevo (304)
+    assert sorted(resultados) == [False, False, False, True]
+    partes = _partes()
+    assert len(partes) == len(set(partes))
+    assert _filas() == len(event_store.cargar_eventos()) == 30
@@ -0,0 +1,64 @@
+"""Concurrencia optimista del registro compartido: borrar solo la versión que se vio."""
+import datetime
+
+import pytest
+
+from utils import registro_journal
+
+
+@pytest.fixture
+def journal(tmp_path, monkeypatch):
+    monkeypatch.setattr(registro_journal, "JOURNAL_DIR", tmp_path)
+    monkeypatch.setattr(registro_journal, "JOURNAL_PATH", tmp_path / "registro.db")
+    monkeypatch.setattr(registro_journal, "_estado", {"conn": None, "pendientes": 0, "ultimo_fsync": 0.0})
+    yield registro_journal
+    if registro_journal._estado["conn"] is not None:
+        registro_journal._estado["conn"].close()
+
+
+def _version(journal, id_accion: int) -> int:
+    return next(v for i, v, *_ in journal.leer_desde(0) if i == id_accion)
+
+
+def test_alta_y_lectura(journal):
+    datos = {"Minuto": 12, "Fecha": datetime.date(2025, 4, 18)}
+    id_accion = journal.registrar_accion(datos, analista="a")
+    assert journal.leer_desde(0) == [(id_accion, 1, False, "a", datos)]
+
+
+def test_borrar_con_la_version_vista(journal):
+    id_accion = journal.registrar_accion({"Minuto": 12})
+    version = _version(journal, id_accion)
+    assert journal.eliminar_accion(id_accion, version)
+    # Lápida con versión nueva: las otras sesiones la ven al sincronizar desde `version`
+    [(id_lapida, version_lapida, borrado, _, datos)] = journal.leer_desde(version)
+    assert (id_lapida, borrado, datos) == (id_accion, True, None)
+    assert version_lapida > version
+
+
+def test_borrar_con_version_vieja(journal):
+    id_accion = journal.registrar_accion({"Minuto": 12})
+    version = _version(journal, id_accion)
+    assert not journal.eliminar_accion(id_accion, version - 1)
+    assert not journal.eliminar_accion(id_accion, version + 1)
+    assert journal.leer_desde(version) == []
+
+
+def test_dos_sesiones_borran_la_misma_accion(journal):
+    id_accion = journal.registrar_accion({"Minuto": 12})
+    vista = _version(journal, id_accion)
+    assert journal.eliminar_accion(id_accion, vista)
+    # La segunda sesión todavía tiene la versión anterior: no vuelve a borrar
+    assert not journal.eliminar_accion(id_accion, vista)
+    assert len(journal.leer_desde(vista)) == 1
+
+
+def test_altas_de_otros_no_invalidan_la_version(journal):
+    id_accion = journal.registrar_accion({"Minuto": 12})
+    vista = _version(journal, id_accion)
+    journal.registrar_accion({"Minuto": 30})
+    assert journal.eliminar_accion(id_accion, vista)
+
+
+def test_borrar_accion_inexistente(journal):
+    assert not journal.eliminar_accion(99, 1)
@@ -0,0 +1,126 @@
+"""Consultas puras del panel analítico: frame filtrado de entrada, resultados chicos de salida.
+
+No tocan Streamlit ni modifican el frame recibido, así que pueden cachearse
+por (versión de datos, idioma, filtros).
+"""
+import numpy as np
+import pandas as pd
+
+
+def _sin_categorias(df: pd.DataFrame) -> pd.DataFrame:
+    # Los resultados son chicos: sin categorías, plotly no agrupa por las que quedaron vacías
+    return df.astype({col: object for col in df.select_dtypes('category').columns})
+
+
+def kpis(df: pd.DataFrame, si: str, club: str) -> dict:
+    # Goles a favor: los del club de la partición; el resto son del rival
+    goles = df['Gol'] == si
+    propio = df['Equipo'] == club
+    total = len(df)
+    goles_favor = int((goles & propio).sum())
+    goles_contra = int((goles & ~propio).sum())
+    return {
+        "acciones": total,
+        "goles_favor": goles_favor,
+        "goles_contra": goles_contra,
+        "eficacia": goles_favor / total * 100 if total > 0 else 0,
+        "eficacia_def": 100 - (goles_contra / total * 100) if total > 0 else 0,
+    }
+
+
+def acciones_por_jornada(df: pd.DataFrame) -> pd.DataFrame:
+    return _sin_categorias(df.groupby(['Jornada', 'Periodo'], observed=True).size().reset_index(name='Cantidad'))
+
+
+def distribucion_minutos(df: pd.DataFrame) -> pd.DataFrame:
+    # Un punto por evento
+    return _sin_categorias(df[['Acción', 'Minuto', 'Equipo']].reset_index(drop=True))
+
+
+def _minutos_por_grupo(df: pd.DataFrame) -> pd.DataFrame:
+    # Eventos por (Acción, Equipo, Minuto): a lo sumo acciones x equipos x minutos filas
+    return _sin_categorias(
+        df.groupby(['Acción', 'Equipo', 'Minuto'], observed=True).size().reset_index(name='Cantidad')
+    ).sort_values(['Acción', 'Equipo', 'Minuto'], kind='stable')
+
+
+def _cuantil(minutos: np.ndarray, acumulado: np.ndarray, p: float) -> float:
+    # Igual que np.quantile (lineal) sobre los eventos expandidos, sin expandirlos
+    posicion = p * (acumulado[-1] - 1)
+    bajo, alto = np.searchsorted(acumulado, [np.floor(posicion), np.ceil(posicion)], side='right')
+    return minutos[bajo] + (minutos[alto] - minutos[bajo]) * (posicion - np.floor(posicion))
+
+
+def resumen_minutos(df: pd.DataFrame) -> pd.DataFrame:
+    """Cuartiles y bigotes (1.5 IQR) del minuto por (Acción, Equipo), calculados desde los conteos por minuto."""
+    filas = []
+    for (accion, equipo), grupo in _minutos_por_grupo(df).groupby(['Acción', 'Equipo'], sort=False):
+        minutos = grupo['Minuto'].to_numpy(dtype=np.float64)
+        acumulado = grupo['Cantidad'].cumsum().to_numpy()
+        q1, mediana, q3 = (_cuantil(minutos, acumulado, p) for p in (0.25, 0.5, 0.75))
+        dentro = minutos[(minutos >= q1 - 1.5 * (q3 - q1)) & (minutos <= q3 + 1.5 * (q3 - q1))]
+        filas.append({
+            'Acción': accion, 'Equipo': equipo, 'Cantidad': int(acumulado[-1]),
+            'q1': q1, 'mediana': mediana, 'q3': q3, 'inferior': dentro.min(), 'superior': dentro.max(),
+        })
+    return pd.DataFrame(filas, columns=[
+        'Acción', 'Equipo', 'Cantidad', 'q1', 'mediana', 'q3', 'inferior', 'superior'
+    ])
+
+
+def muestra_minutos(df: pd.DataFrame, max_puntos: int) -> pd.DataFrame:
+    """Como distribucion_minutos pero con ~max_puntos eventos en total.
+
+    Cada (Acción, Equipo, Minuto) conserva una parte proporcional a su conteo
+    (al menos un punto), así la forma de la distribución no cambia.
+    """
+    conteos = _minutos_por_grupo(df)
+    escala = min(1.0, max_puntos / max(int(conteos['Cantidad'].sum()), 1))
+    repeticiones = np.ceil(conteos['Cantidad'].to_numpy() * escala).astype(np.int64)
+    return conteos.loc[conteos.index.repeat(repeticiones), ['Acción', 'Minuto', 'Equipo']].reset_index(drop=True)
+
+
+def efectividad_ejecutor(df: pd.DataFrame, si: str, por: str = 'Ejecutor') -> pd.DataFrame:
+    return _sin_categorias(
+        df.assign(Goles=df['Gol'] == si)
+        .groupby(por, observed=True)
+        .agg(Acciones=(por, 'size'), Goles=('Goles', 'sum'))
+        .reset_index()
+    )
+
+
+def composicion_resultados(df: pd.DataFrame, etiqueta_total: str) -> pd.DataFrame:
+    df_sun = _sin_categorias(df.groupby(['Acción', 'Resultado'], observed=True).size().reset_index(name='Cantidad'))
+    df_sun = df_sun[df_sun['Resultado'].notna()]
+
+    total = df_sun['Cantidad'].sum()
+    df_sun['Porcentaje'] = df_sun['Cantidad'] / total * 100
+
+    df_accion = df_sun.groupby('Acción', observed=True)['Cantidad'].sum().reset_index()
+    df_accion['Resultado'] = etiqueta_total
+    df_accion['Porcentaje'] = df_accion['Cantidad'] / total * 100
+
+    df_sunburst = pd.concat([df_sun, df_accion], ignore_index=True)
+    df_sunburst['Porcentaje'] = df_sunburst['Porcentaje'].fillna(0)
+    return df_sunburst
+
+
+def ranking_parte_cuerpo(df: pd.DataFrame, acciones_ofensivas: list, ofensiva: str, defensiva: str) -> list:
+    """[(tipo, ranking por Ejecutor/Parte Cuerpo, orden de ejecutores)] para ofensivas y defensivas."""
+    es_ofensiva = df['Acción'].isin(acciones_ofensivas)
+    con_parte = df['Parte Cuerpo'].notna()
+    resultado = []
+    for tipo, mascara in [(ofensiva, es_ofensiva), (defensiva, ~es_ofensiva)]:
+        df_ranking = _sin_categorias(
+            df[mascara & con_parte]
+            .groupby(['Ejecutor', 'Parte Cuerpo'], observed=True).size()
+            .reset_index(name='Cantidad')
+        )
+        total_jugadores = df_ranking.groupby('Ejecutor', observed=True)['Cantidad'].sum().sort_values(ascending=False)
+        df_ranking['Ejecutor'] = pd.Categorical(
+            df_ranking['Ejecutor'],
+            categories=total_jugadores.index,
+            ordered=True
+        )
+        resultado.append((tipo, df_ranking, total_jugadores.index.tolist()))
+    return resultado
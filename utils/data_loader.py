@@ -1,21 +1,12 @@
 import pandas as pd
-import requests
 import streamlit as st
-from io import StringIO
+from utils.event_store import cargar_eventos
 
 def load_github_data():
     try:
-        # Usar URL raw correcta
-        url = "https://raw.githubusercontent.com/felipeorma/abp/main/master_abp.csv"
-        response = requests.get(url)
-        response.raise_for_status()
-        
-        df = pd.read_csv(StringIO(response.text))
-        
-        # Convertir coordenadas
+        # Almacén local sincronizado con el CSV raw de GitHub (coordenadas ya float32 al ingerir)
+        df = cargar_eventos()
         coord_cols = ['x_saque', 'y_saque', 'x_remate', 'y_remate']
-        df[coord_cols] = df[coord_cols].apply(pd.to_numeric, errors='coerce')
-        
         return df.dropna(subset=coord_cols)
         
     except Exception as e:
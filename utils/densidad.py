@@ -0,0 +1,87 @@
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from utils.zonas import ZONAS, ZONA_X, ZONA_Y, SIN_ZONA, codificar_zonas, codigo_zona
+
+# Malla StatsBomb (120 x 80) a medio metro
+PASO_MALLA = 0.5
+MALLA_X = np.arange(0, 120 + PASO_MALLA, PASO_MALLA)
+MALLA_Y = np.arange(0, 80 + PASO_MALLA, PASO_MALLA)
+
+# Anchos de banda cuantizados para reutilizar kernels entre filtros
+PASO_BANDA = 0.25
+BANDA_MINIMA = 2.0
+
+
+def conteo_zonas(serie: pd.Series) -> np.ndarray:
+    """Eventos por zona: el único dato que necesita el mapa de calor."""
+    codigos = codificar_zonas(serie)
+    return np.bincount(codigos[codigos != SIN_ZONA], minlength=len(ZONAS))
+
+
+def acumular_zona(conteos: np.ndarray, zona, delta: int = 1):
+    """Suma (o resta, con delta=-1) un evento al vector de conteos por zona, en O(1).
+
+    Para mantener los conteos al día evento a evento en vez de recontar la serie.
+    """
+    codigo = codigo_zona(zona)
+    if codigo != SIN_ZONA:
+        conteos[codigo] += delta
+
+
+def _banda(conteos: np.ndarray, coords: np.ndarray, bw_adjust: float) -> float:
+    # Regla de Scott (como seaborn) con la media y varianza ponderadas por zona
+    n = conteos.sum()
+    media = np.dot(conteos, coords) / n
+    std = np.sqrt(np.dot(conteos, (coords - media) ** 2) / n)
+    banda = max(std * n ** (-1 / 6) * bw_adjust, BANDA_MINIMA)
+    return round(banda / PASO_BANDA) * PASO_BANDA
+
+
+@lru_cache(maxsize=64)
+def kernels_zonas(banda_x: float, banda_y: float) -> tuple:
+    """Kernels gaussianos separables por zona: (zonas, x) y (zonas, y)."""
+    gx = np.exp(-0.5 * ((MALLA_X[None, :] - ZONA_X[:, None]) / banda_x) ** 2)
+    gy = np.exp(-0.5 * ((MALLA_Y[None, :] - ZONA_Y[:, None]) / banda_y) ** 2)
+    gx /= np.sqrt(2 * np.pi) * banda_x
+    gy /= np.sqrt(2 * np.pi) * banda_y
+    gx.setflags(write=False)
+    gy.setflags(write=False)
+    return gx, gy
+
+
+# ~0,3 MB por malla y una caché por proceso (también en los de render): pocas entradas
+@lru_cache(maxsize=32)
+def _densidad(conteos: tuple, bw_adjust: float) -> np.ndarray:
+    pesos = np.asarray(conteos, dtype=np.float64)
+    gx, gy = kernels_zonas(
+        _banda(pesos, ZONA_X, bw_adjust),
+        _banda(pesos, ZONA_Y, bw_adjust)
+    )
+    # Suma ponderada de kernels: (y, zonas) @ (zonas, x)
+    densidad = (gy.T * (pesos / pesos.sum())) @ gx
+    densidad.setflags(write=False)
+    return densidad
+
+
+def densidad_zonas(conteos: np.ndarray, bw_adjust: float):
+    """Suma de kernels ponderada por conteo; memoizada por el vector de conteos.
+
+    Devuelve None si no hay eventos.
+    """
+    if np.sum(conteos) == 0:
+        return None
+    return _densidad(tuple(int(c) for c in conteos), float(bw_adjust))
+
+
+def niveles_densidad(densidad: np.ndarray, levels: int = 100, thresh: float = 0.05) -> np.ndarray:
+    # Niveles de iso-proporción de masa, igual que seaborn.kdeplot
+    isoprop = np.linspace(thresh, 1, levels)
+    valores = np.sort(densidad.ravel())[::-1]
+    acumulado = np.cumsum(valores) / valores.sum()
+    niveles = np.take(valores, np.searchsorted(acumulado, 1 - isoprop), mode="clip")
+    niveles = np.unique(niveles)
+    return niveles if len(niveles) > 1 else np.array([niveles[0], densidad.max()])
+
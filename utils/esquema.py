@@ -0,0 +1,265 @@
+"""Esquemas declarativos de cada fuente de datos, validados y tipados al ingerirlas.
+
+Cada esquema es {columna: (tipo, requerida)}. `validar` recorre el archivo
+completo una sola vez, con operaciones vectorizadas por columna, y junta
+todas las violaciones: columnas requeridas que faltan (error) y valores que
+no encajan en su tipo (quedan nulos y se informan). Quien llama guarda el
+resultado ya validado, así los reruns no vuelven a validar.
+
+Los eventos ABP quedan compactos: enumeraciones como categorías, enteros
+chicos para minuto y zonas, float32 para coordenadas y booleano para el gol.
+"""
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from utils.zonas import ZONA_PENAL
+
+# Subir al cambiar un esquema: el almacén y las cachés de temporadas se regeneran
+VERSION_ESQUEMA = 1
+
+ESQUEMA_EVENTOS = {
+    'Jornada': ('category', True),
+    'Rival': ('category', True),
+    'Condición': ('category', True),
+    'Fecha': ('category', True),  # texto tal como viene en el CSV; se parsea al preparar el panel
+    'Minuto': ('Int16', True),
+    'Periodo': ('category', True),
+    'Acción': ('category', True),
+    'Equipo': ('category', True),
+    'Ejecutor': ('category', True),
+    'Zona Saque': ('Int8', True),
+    'Zona Remate': ('Int8', True),
+    'x_saque': ('float32', False),
+    'y_saque': ('float32', False),
+    'x_remate': ('float32', False),
+    'y_remate': ('float32', False),
+    'Primer Contacto': ('category', False),
+    'Parte Cuerpo': ('category', True),
+    'Segundo Contacto': ('category', False),
+    'Gol': ('boolean', True),
+    'Resultado': ('category', True),
+    'Perfil': ('category', False),
+    'Estrategia': ('category', False),
+    'Tipo Ejecución': ('category', False),
+}
+
+# Encabezados en minúsculas de versiones anteriores del CSV
+ALIAS_EVENTOS = {
+    'jornada': 'Jornada',
+    'fecha': 'Fecha',
+    'rival': 'Rival',
+    'condición': 'Condición',
+    'periodo': 'Periodo',
+    'minuto': 'Minuto',
+    'acción': 'Acción',
+    'equipo': 'Equipo',
+    'ejecutor': 'Ejecutor',
+    'zona_saque': 'Zona Saque',
+    'zona_remate': 'Zona Remate',
+    'gol': 'Gol',
+    'resultado': 'Resultado',
+    'parte_cuerpo': 'Parte Cuerpo'
+}
+
+# Planilla de jugadores por partido (matches.csv)
+ESQUEMA_PARTIDOS = {
+    'Round': ('str', True),
+    'Date': ('fecha', True),
+    'Local/Visit': ('str', True),
+    'Cavalry/Opponent': ('str', True),
+    'Team': ('str', True),
+    'Position': ('str', True),
+    'Player': ('str', True),
+    'Photo': ('str', True),
+    'Minutes played': ('numero', True),
+    'Goals': ('numero', False),
+    'Assists': ('numero', False),
+    'Saves': ('numero', False),
+    'Goal Against': ('numero', False),
+    'heatmap': ('str', True),
+}
+
+# Libros de temporada (Cavalry<año>stats.xlsx); el resto de las columnas pasa igual
+ESQUEMA_TEMPORADAS = {
+    'Round': ('ronda', True),
+    'Match': ('str', True),
+    'Date': ('fecha', True),
+    'PPDA': ('numero', True),
+    'PPDA 1st Half': ('numero', True),
+    'PPDA 2nd Half': ('numero', True),
+    'xG': ('numero', False),
+    'Possession, %': ('numero', False),
+}
+
+ESQUEMAS = {
+    "eventos": (ESQUEMA_EVENTOS, ALIAS_EVENTOS),
+    "partidos": (ESQUEMA_PARTIDOS, {}),
+    "temporadas": (ESQUEMA_TEMPORADAS, {}),
+}
+
+VALORES_GOL = {'Sí': True, 'No': False}
+RANGOS_ENTEROS = {'Int8': (-128, 127), 'Int16': (-32768, 32767)}
+MAX_EJEMPLOS = 3
+
+
+class ErrorEsquema(ValueError):
+    """El archivo no cumple su esquema; lleva todas las violaciones, no solo la primera."""
+
+    def __init__(self, fuente: str, violaciones: list):
+        self.fuente = fuente
+        self.violaciones = violaciones
+        super().__init__(f"{fuente}: " + "; ".join(describir(v) for v in violaciones))
+
+
+def describir(violacion: dict) -> str:
+    if violacion["problema"] == "faltante":
+        return f"falta la columna '{violacion['columna']}'"
+    ejemplos = ", ".join(repr(e) for e in violacion["ejemplos"])
+    return f"'{violacion['columna']}': {violacion['filas']} valores no válidos como {violacion['tipo']} ({ejemplos})"
+
+
+def _entero(serie: pd.Series, tipo: str) -> pd.Series:
+    # Números enteros dentro del rango del tipo; el resto queda nulo
+    if serie.dtype == object:
+        serie = serie.where(serie != 'Penal', ZONA_PENAL)
+    valores = pd.to_numeric(serie, errors='coerce')
+    minimo, maximo = RANGOS_ENTEROS[tipo]
+    valores = valores.where((valores == np.round(valores)) & valores.between(minimo, maximo))
+    return valores.astype(tipo)
+
+
+def _booleano(serie: pd.Series, tipo: str) -> pd.Series:
+    if pd.api.types.is_bool_dtype(serie):
+        return serie.astype(tipo)
+    return serie.map(VALORES_GOL).astype(tipo)
+
+
+def _texto(serie: pd.Series, tipo: str) -> pd.Series:
+    # Como `astype(str)` pero conservando los nulos (una columna vacía queda como vino)
+    presentes = serie.notna()
+    if not presentes.any():
+        return serie
+    return serie.astype(str).where(presentes)
+
+
+def _ronda(serie: pd.Series, tipo: str) -> pd.Series:
+    # "Round4" -> "Round 4"
+    return serie.astype(str).str.replace(r"(\D)(\d)", r"\1 \2", regex=True).str.strip().where(serie.notna())
+
+
+def _fecha(serie: pd.Series, tipo: str) -> pd.Series:
+    return pd.to_datetime(serie, errors='coerce')
+
+
+def _numero(serie: pd.Series, tipo: str) -> pd.Series:
+    if tipo == 'numero':
+        return pd.to_numeric(serie, errors='coerce')
+    return pd.to_numeric(serie, errors='coerce').astype(tipo)
+
+
+CONVERSORES = {
+    'category': lambda serie, tipo: serie.astype('category'),
+    'Int8': _entero,
+    'Int16': _entero,
+    'boolean': _booleano,
+    'str': _texto,
+    'ronda': _ronda,
+    'fecha': _fecha,
+}
+
+
+@lru_cache(maxsize=None)
+def _compilar(fuente: str) -> tuple:
+    # Una vez por fuente: (columna, tipo, conversor, requerida) en el orden del esquema
+    esquema, _ = ESQUEMAS[fuente]
+    return tuple((col, tipo, CONVERSORES.get(tipo, _numero), requerida) for col, (tipo, requerida) in esquema.items())
+
+
+def _ejemplos(valores: pd.Series) -> list:
+    return [v.item() if isinstance(v, np.generic) else v for v in valores.drop_duplicates().head(MAX_EJEMPLOS)]
+
+
+def validar(df: pd.DataFrame, fuente: str) -> tuple:
+    """(frame tipado según el esquema de `fuente`, violaciones no fatales).
+
+    Lanza ErrorEsquema con todas las violaciones si falta alguna columna
+    requerida. Las columnas fuera del esquema quedan igual.
+    """
+    _, alias = ESQUEMAS[fuente]
+    if alias:
+        df = df.rename(columns=alias)
+    faltantes = [
+        {"columna": col, "problema": "faltante"}
+        for col, _, _, requerida in _compilar(fuente) if requerida and col not in df.columns
+    ]
+
+    columnas = {}
+    violaciones = []
+    for col, tipo, conversor, _ in _compilar(fuente):
+        if col not in df.columns:
+            continue
+        serie = df[col]
+        convertida = serie if serie.dtype == tipo else conversor(serie, tipo)
+        invalidos = serie.notna().to_numpy() & convertida.isna().to_numpy()
+        if invalidos.any():
+            violaciones.append({
+                "columna": col,
+                "problema": "tipo",
+                "tipo": tipo,
+                "filas": int(invalidos.sum()),
+                "ejemplos": _ejemplos(serie[invalidos]),
+            })
+        columnas[col] = convertida
+
+    if faltantes:
+        raise ErrorEsquema(fuente, faltantes + violaciones)
+    return df.assign(**columnas), violaciones
+
+
+def concatenar(frames: list) -> pd.DataFrame:
+    """pd.concat que conserva las categorías: unifica las de cada columna antes de unir.
+
+    (pd.concat de categóricas con categorías distintas devuelve object.)
+    """
+    frames = [f for f in frames if len(f.columns)]
+    if len(frames) <= 1:
+        return frames[0].reset_index(drop=True) if frames else pd.DataFrame()
+    unificadas = {}
+    for col in frames[0].columns:
+        series = [f[col] for f in frames if col in f.columns]
+        if all(isinstance(s.dtype, pd.CategoricalDtype) for s in series):
+            categorias = [s.cat.categories for s in series]
+            if any(not c.equals(categorias[0]) for c in categorias[1:]):
+                unificadas[col] = categorias[0].append(categorias[1:]).unique()
+    if unificadas:
+        frames = [
+            f.assign(**{
+                col: f[col].cat.set_categories(categorias)
+                for col, categorias in unificadas.items() if col in f.columns
+            })
+            for f in frames
+        ]
+    return pd.concat(frames, ignore_index=True)
+
+
+def bytes_por_evento(df: pd.DataFrame) -> float:
+    # Memoria real (deep: cuenta los str de las columnas object) por fila
+    return df.memory_usage(deep=True, index=False).sum() / max(len(df), 1)
+
+
+def reporte_memoria(antes: pd.DataFrame, despues: pd.DataFrame) -> dict:
+    """Bytes por evento antes y después de tipar, en total y por columna."""
+    columnas = {}
+    for col in despues.columns:
+        if col in antes.columns:
+            columnas[col] = {
+                "antes": round(antes[col].memory_usage(deep=True, index=False) / max(len(antes), 1), 2),
+                "despues": round(despues[col].memory_usage(deep=True, index=False) / max(len(despues), 1), 2),
+            }
+    return {
+        "antes": round(bytes_por_evento(antes), 2),
+        "despues": round(bytes_por_evento(despues), 2),
+        "columnas": columnas,
+    }
@@ -0,0 +1,332 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from io import BytesIO
+from pathlib import Path
+from urllib.parse import quote
+
+import numpy as np
+import pandas as pd
+import requests
+
+try:
+    import fcntl
+except ImportError:  # Windows: solo se serializa dentro del proceso
+    fcntl = None
+
+from utils.esquema import VERSION_ESQUEMA, concatenar, validar
+
+# Fuente remota y copia empaquetada con el repo (semilla cuando no hay red)
+MASTER_URL = "https://raw.githubusercontent.com/felipeorma/abp/main/master_abp.csv"
+ROOT_DIR = Path(__file__).resolve().parent.parent
+LOCAL_CSV = ROOT_DIR / "master_abp.csv"
+
+# Un CSV de eventos por club registrado; la semilla local es opcional
+FUENTES = {"Cavalry FC": MASTER_URL}
+SEMILLAS = {"Cavalry FC": LOCAL_CSV}
+
+# Almacén local particionado por temporada/club/jornada (Parquet) + metadatos HTTP por club
+CACHE_DIR = ROOT_DIR / ".cache" / "abp"
+PARTICIONES_DIR = CACHE_DIR / "eventos"
+MANIFIESTO_PATH = CACHE_DIR / "particiones.json"
+
+# Archivos por partición antes de compactarlos en uno solo
+MAX_PARTES = 16
+
+# Segundos entre revalidaciones contra GitHub (evita un round trip por rerun)
+INTERVALO_REVALIDACION = 60
+TIMEOUT = 5
+
+# Violaciones de esquema recordadas por club (las de las últimas ingestas)
+MAX_VIOLACIONES = 50
+
+_memoria = {}  # archivo de una parte (nombre = hash del contenido) -> DataFrame
+_lock = threading.Lock()
+
+
+def _leer_json(path: Path) -> dict:
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+
+def _meta_path(club: str) -> Path:
+    return CACHE_DIR / f"{quote(club, safe='')}.json"
+
+
+def _escribir_atomico(path: Path, data: bytes):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Temporal propio de cada escritor: dos refrescos a la vez no se pisan el archivo
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    with open(tmp, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def _temporadas(df: pd.DataFrame) -> pd.Series:
+    # El año de 'Fecha' es la temporada (la CPL se juega dentro del año calendario)
+    return df['Fecha'].astype(str).str.extract(r'(\d{4})', expand=False).fillna(0).astype(int)
+
+
+def _escribir_parte(directorio: str, df: pd.DataFrame) -> str:
+    buffer = BytesIO()
+    df.to_parquet(buffer, index=False)
+    parte = f"{directorio}/{hashlib.sha1(buffer.getvalue()).hexdigest()[:16]}.parquet"
+    _escribir_atomico(PARTICIONES_DIR / parte, buffer.getvalue())
+    return parte
+
+
+def _particionar(club: str, df: pd.DataFrame, previas: dict) -> list:
+    """Escribe las filas (ya validadas) de cada (temporada, jornada) y devuelve sus entradas de manifiesto.
+
+    Cada partición es un directorio de partes inmutables. Si ya figura en
+    `previas` (directorio -> entrada), las filas van a una parte nueva y las
+    existentes no se reescriben, salvo al compactar pasadas MAX_PARTES.
+    """
+    entradas = []
+    grupos = df.groupby([_temporadas(df), df['Jornada'].astype(object).fillna('')], sort=False)
+    for (temporada, jornada), grupo in grupos:
+        archivo = f"temporada={temporada}/equipo={quote(club, safe='')}/jornada={quote(jornada, safe='')}"
+        previa = previas.get(archivo, {"partes": [], "filas": 0, "rivales": []})
+        partes = previa["partes"] + [_escribir_parte(archivo, grupo)]
+        if len(partes) > MAX_PARTES:
+            partes = [_escribir_parte(archivo, concatenar([_leer_parte(p) for p in partes]))]
+        entradas.append({
+            "temporada": int(temporada),
+            "equipo": club,
+            "jornada": jornada,
+            "archivo": archivo,
+            "partes": partes,
+            "filas": previa["filas"] + len(grupo),
+            "rivales": sorted(set(previa["rivales"]) | set(grupo['Rival'].dropna().astype(str))),
+        })
+    return entradas
+
+
+def _ultima_fila(contenido: bytes) -> bytes:
+    # Última línea no vacía, con su salto de línea si lo tiene
+    return contenido[contenido.rstrip(b"\r\n").rfind(b"\n") + 1:]
+
+
+def _publicar(club: str, entradas: list, version: str, completo: bool):
+    """Registra las particiones escritas en el manifiesto y cambia la versión del club."""
+    manifiesto = _leer_json(MANIFIESTO_PATH)
+    previas = [p for p in manifiesto.get("particiones", []) if p["equipo"] == club]
+    otras = [p for p in manifiesto.get("particiones", []) if p["equipo"] != club]
+    if completo:
+        propias = entradas
+    else:
+        nuevas = {p["archivo"]: p for p in entradas}
+        propias = [nuevas.pop(p["archivo"], p) for p in previas] + list(nuevas.values())
+    versiones = {**manifiesto.get("versiones", {}), club: version}
+    manifiesto = {
+        "particiones": otras + propias,
+        "versiones": versiones,
+        "version": hashlib.sha1(json.dumps(versiones, sort_keys=True).encode("utf-8")).hexdigest(),
+    }
+    _escribir_atomico(MANIFIESTO_PATH, json.dumps(manifiesto, ensure_ascii=False).encode("utf-8"))
+
+    # Partes de este club que ya no se usan (recarga completa, compactación, jornada renombrada)
+    vigentes = {parte for p in propias for parte in p["partes"]}
+    for p in previas:
+        for parte in p.get("partes", [p["archivo"]]):
+            if parte not in vigentes:
+                (PARTICIONES_DIR / parte).unlink(missing_ok=True)
+                _memoria.pop(parte, None)
+
+
+def _marcar_fin(meta: dict, contenido: bytes, largo: int):
+    # Posición hasta la que se procesó el CSV y huella de la última fila vista
+    ultima = _ultima_fila(contenido)
+    meta["bytes"] = largo
+    meta["largo_fila"] = len(ultima)
+    meta["hash_fila"] = hashlib.sha1(ultima).hexdigest()
+
+
+def _guardar(club: str, contenido: bytes, meta: dict):
+    # Un archivo que no cumple el esquema no se publica (ErrorEsquema con todas las violaciones)
+    df, meta["violaciones"] = validar(pd.read_csv(BytesIO(contenido)), "eventos")
+    meta["version"] = hashlib.sha1(contenido).hexdigest()
+    meta["esquema"] = VERSION_ESQUEMA
+    _publicar(club, _particionar(club, df, {}), meta["version"], completo=True)
+
+    meta["encabezado"] = contenido.split(b"\n", 1)[0].decode("utf-8")
+    _marcar_fin(meta, contenido, len(contenido))
+    _escribir_atomico(_meta_path(club), json.dumps(meta).encode("utf-8"))
+
+
+def _anexar(club: str, cola: bytes, meta: dict) -> bool:
+    """Ingiere solo las filas nuevas del CSV.
+
+    `cola` empieza en la última fila ya procesada; si esa fila no coincide
+    con la huella guardada el archivo se reescribió y devuelve False.
+    """
+    largo = meta["largo_fila"]
+    if len(cola) < largo or hashlib.sha1(cola[:largo]).hexdigest() != meta["hash_fila"]:
+        return False
+    nuevos = cola[largo:]
+    if nuevos.strip():
+        df, violaciones = validar(pd.read_csv(BytesIO(meta["encabezado"].encode("utf-8") + b"\n" + nuevos)), "eventos")
+        meta["violaciones"] = (meta.get("violaciones", []) + violaciones)[-MAX_VIOLACIONES:]
+        previas = {
+            p["archivo"]: p for p in _leer_json(MANIFIESTO_PATH).get("particiones", []) if p["equipo"] == club
+        }
+        # Versión encadenada: la anterior más el hash de lo agregado
+        meta["version"] = hashlib.sha1((meta["version"] + hashlib.sha1(nuevos).hexdigest()).encode()).hexdigest()
+        _publicar(club, _particionar(club, df, previas), meta["version"], completo=False)
+    _marcar_fin(meta, cola, meta["bytes"] - largo + len(cola))
+    _escribir_atomico(_meta_path(club), json.dumps(meta).encode("utf-8"))
+    return True
+
+
+@contextmanager
+def _bloqueo_store():
+    """Serializa revalidación e ingesta entre las sesiones (hilos) y entre procesos."""
+    with _lock:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        with open(CACHE_DIR / ".lock", "wb") as f:
+            if fcntl:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            yield
+
+
+def _vigente(meta: dict) -> bool:
+    # Partes escritas con otro esquema: se vuelve a ingerir todo
+    return "bytes" in meta and meta.get("esquema") == VERSION_ESQUEMA
+
+
+def _revisado_hace_poco(meta: dict) -> bool:
+    return _vigente(meta) and time.time() - meta.get("revisado", 0) < INTERVALO_REVALIDACION
+
+
+def refrescar_store(club: str = "Cavalry FC", url: str = None, forzar: bool = False) -> bool:
+    """Revalida las particiones de un club con una petición condicional. Devuelve True si cambiaron."""
+    url = url or FUENTES[club]
+    if not forzar and _revisado_hace_poco(_leer_json(_meta_path(club))):
+        return False
+    with _bloqueo_store():
+        # Metadatos y manifiesto se releen con el bloqueo: otra sesión pudo ingerir mientras se esperaba
+        meta = _leer_json(_meta_path(club))
+        if not forzar and _revisado_hace_poco(meta):
+            return False
+        return _refrescar(club, url, meta)
+
+
+def _refrescar(club: str, url: str, meta: dict) -> bool:
+    existe = _vigente(meta)
+    headers = {}
+    if existe:
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+        # El CSV solo crece: pedir desde la última fila procesada (sin gzip, el rango es sobre bytes crudos)
+        headers["Range"] = f"bytes={meta['bytes'] - meta['largo_fila']}-"
+        headers["Accept-Encoding"] = "identity"
+
+    try:
+        response = requests.get(url, headers=headers, timeout=TIMEOUT)
+        if response.status_code == 416:
+            # Rango fuera del archivo: se truncó, recarga completa
+            response = requests.get(url, timeout=TIMEOUT)
+        if response.status_code != 304:
+            response.raise_for_status()
+    except requests.RequestException:
+        # Red inestable: seguir con la copia local y sembrarla si aún no existe
+        if not existe and club in SEMILLAS:
+            semilla = SEMILLAS[club]
+            _guardar(club, semilla.read_bytes(), {"origen": str(semilla), "revisado": time.time()})
+            return True
+        meta["revisado"] = time.time()
+        _escribir_atomico(_meta_path(club), json.dumps(meta).encode("utf-8"))
+        return False
+
+    meta["revisado"] = time.time()
+    if response.status_code == 304:
+        _escribir_atomico(_meta_path(club), json.dumps(meta).encode("utf-8"))
+        return False
+
+    meta.update({
+        "origen": url,
+        "etag": response.headers.get("ETag"),
+        "last_modified": response.headers.get("Last-Modified"),
+    })
+    if response.status_code == 206 and _anexar(club, response.content, meta):
+        return True
+    if response.status_code == 200 and existe and len(response.content) >= meta["bytes"]:
+        # Servidor sin soporte de rangos: se descargó todo, pero se parsea solo la cola
+        if _anexar(club, response.content[meta["bytes"] - meta["largo_fila"]:], meta):
+            return True
+    if response.status_code == 206:
+        # Reescritura detectada en la cola: bajar el archivo completo
+        try:
+            response = requests.get(url, timeout=TIMEOUT)
+            response.raise_for_status()
+        except requests.RequestException:
+            return False
+        meta["etag"] = response.headers.get("ETag")
+        meta["last_modified"] = response.headers.get("Last-Modified")
+
+    _guardar(club, response.content, {
+        "origen": url,
+        "etag": meta["etag"],
+        "last_modified": meta["last_modified"],
+        "revisado": meta["revisado"],
+    })
+    return True
+
+
+def violaciones_store(club: str) -> list:
+    # Valores que no encajaron en el esquema al ingerir (quedaron nulos)
+    return _leer_json(_meta_path(club)).get("violaciones", [])
+
+
+def version_store() -> str:
+    return _leer_json(MANIFIESTO_PATH).get("version", "")
+
+
+def catalogo(clubes=None) -> list:
+    """Entradas del manifiesto (temporada, equipo, jornada, filas, rivales); no lee ningún Parquet."""
+    for club in clubes or FUENTES:
+        refrescar_store(club)
+    return _leer_json(MANIFIESTO_PATH).get("particiones", [])
+
+
+def podar(particiones: list, temporadas=None, clubes=None, jornadas=None, rivales=None) -> list:
+    # None = sin restricción en esa dimensión
+    return [
+        p for p in particiones
+        if (temporadas is None or p["temporada"] in temporadas)
+        and (clubes is None or p["equipo"] in clubes)
+        and (jornadas is None or p["jornada"] in jornadas)
+        and (rivales is None or not set(p["rivales"]).isdisjoint(rivales))
+    ]
+
+
+def _leer_parte(parte: str) -> pd.DataFrame:
+    # El nombre incluye el hash del contenido: una parte memoizada nunca queda vieja
+    if parte not in _memoria:
+        _memoria[parte] = pd.read_parquet(PARTICIONES_DIR / parte)
+    return _memoria[parte]
+
+
+def cargar_eventos(temporadas=None, clubes=None, jornadas=None, rivales=None) -> pd.DataFrame:
+    """Eventos ABP de las particiones que pasan la poda; solo toca la red al revalidar.
+
+    Agrega las columnas 'Temporada' y 'Club' de la partición de origen.
+    """
+    particiones = podar(catalogo(clubes), temporadas, clubes, jornadas, rivales)
+    if not particiones:
+        return pd.DataFrame()
+    frames = [[_leer_parte(parte) for parte in p["partes"]] for p in particiones]
+    df = concatenar([f for partes in frames for f in partes])
+    largos = [sum(len(f) for f in partes) for partes in frames]
+    df['Temporada'] = np.repeat(np.array([p["temporada"] for p in particiones], dtype=np.int16), largos)
+    df['Club'] = pd.Categorical(np.repeat(np.array([p["equipo"] for p in particiones], dtype=object), largos))
+    return df
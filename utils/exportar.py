@@ -0,0 +1,136 @@
+"""Exportación de datos filtrados en CSV, Parquet, XLSX o un zip con los mapas de calor.
+
+El archivo se arma solo cuando alguien lo pide (no para armar el botón en cada
+rerun), por trozos de filas para no duplicar el DataFrame entero en memoria, y
+queda cacheado por (clave de los datos, formato).
+"""
+import io
+import zipfile
+
+import pandas as pd
+import streamlit as st
+
+from utils.i18n import get_text
+
+# Filas por trozo al escribir
+TAMANO_TROZO = 50_000
+# Filas de datos por hoja de Excel (el límite es 1.048.576 contando el encabezado)
+MAX_FILAS_XLSX = 1_048_575
+
+FORMATOS = {
+    "csv": ("CSV", "text/csv"),
+    "parquet": ("Parquet", "application/vnd.apache.parquet"),
+    "xlsx": ("Excel (XLSX)", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+    "zip": ("ZIP (CSV + mapas de calor)", "application/zip"),
+}
+
+
+def trozos(df: pd.DataFrame, tamano: int = TAMANO_TROZO):
+    for inicio in range(0, len(df), tamano):
+        yield inicio, df.iloc[inicio:inicio + tamano]
+
+
+def escribir_csv(df: pd.DataFrame, destino, encoding: str = "utf-8"):
+    # El BOM de utf-8-sig va solo al principio, no en cada trozo
+    for inicio, trozo in trozos(df):
+        destino.write(trozo.to_csv(index=False, header=inicio == 0).encode(encoding if inicio == 0 else "utf-8"))
+    if df.empty:
+        destino.write(df.to_csv(index=False).encode(encoding))
+
+
+def _para_arrow(df: pd.DataFrame) -> pd.DataFrame:
+    # Columnas object con tipos mezclados (p. ej. zonas 7 y "Penal") pasan a texto
+    mezcladas = [
+        col for col in df.select_dtypes(object).columns
+        if pd.api.types.infer_dtype(df[col], skipna=True).startswith("mixed")
+    ]
+    return df.assign(**{col: df[col].astype(str).where(df[col].notna()) for col in mezcladas})
+
+
+def escribir_parquet(df: pd.DataFrame, destino):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    df = _para_arrow(df)
+    # Tipos inferidos del DataFrame completo: un trozo sin valores en una columna no la deja en null
+    esquema = pa.Schema.from_pandas(df, preserve_index=False)
+    with pq.ParquetWriter(destino, esquema) as escritor:
+        # Un row group por trozo
+        for _, trozo in trozos(df):
+            escritor.write_table(pa.Table.from_pandas(trozo, schema=esquema, preserve_index=False))
+
+
+def escribir_xlsx(df: pd.DataFrame, destino, hoja: str = "datos"):
+    from openpyxl import Workbook
+
+    # write_only: las filas se vuelcan al archivo a medida que se agregan
+    libro = Workbook(write_only=True)
+    for numero, (_, parte) in enumerate(trozos(df, MAX_FILAS_XLSX) if len(df) else [(0, df)]):
+        ws = libro.create_sheet(hoja if numero == 0 else f"{hoja}_{numero + 1}")
+        ws.append([str(col) for col in parte.columns])
+        for _, trozo in trozos(parte):
+            for fila in trozo.astype(object).where(trozo.notna(), None).itertuples(index=False, name=None):
+                ws.append(fila)
+    libro.save(destino)
+
+
+def escribir_zip(df: pd.DataFrame, destino, imagenes: dict, nombre: str, encoding: str = "utf-8"):
+    with zipfile.ZipFile(destino, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        with zf.open(f"{nombre}.csv", "w") as csv:
+            escribir_csv(df, csv, encoding)
+        # Los PNG ya vienen comprimidos
+        for archivo, png in imagenes.items():
+            zf.writestr(archivo, png, compress_type=zipfile.ZIP_STORED)
+
+
+def exportar(df: pd.DataFrame, formato: str, nombre: str = "datos", imagenes: dict = None,
+             encoding: str = "utf-8") -> bytes:
+    """Bytes del archivo de `df` en `formato` (una clave de FORMATOS)."""
+    destino = io.BytesIO()
+    if formato == "csv":
+        escribir_csv(df, destino, encoding)
+    elif formato == "parquet":
+        escribir_parquet(df, destino)
+    elif formato == "xlsx":
+        escribir_xlsx(df, destino)
+    elif formato == "zip":
+        escribir_zip(df, destino, imagenes or {}, nombre, encoding)
+    else:
+        raise ValueError(f"Formato de exportación desconocido: {formato}")
+    return destino.getvalue()
+
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def _exportacion(clave: tuple, formato: str, nombre: str, encoding: str, _df, _imagenes):
+    # `clave` identifica los datos (versión, filtros): no se hashean `_df` ni las imágenes
+    return exportar(_df, formato, nombre, _imagenes() if _imagenes else None, encoding)
+
+
+def mostrar_exportacion(lang: str, clave: tuple, df: pd.DataFrame, nombre: str, imagenes=None,
+                        encoding: str = "utf-8", key: str = "exportar"):
+    """Selector de formato y descarga armada a pedido.
+
+    `imagenes` es una función que devuelve {archivo: PNG} para el zip; solo se
+    llama si se exporta en ese formato.
+    """
+    formato = st.selectbox(
+        get_text(lang, "export_format"),
+        options=list(FORMATOS),
+        format_func=lambda f: FORMATOS[f][0],
+        key=f"{key}_formato"
+    )
+    pedido = (clave, formato)
+    if st.button(get_text(lang, "prepare_export"), key=f"{key}_preparar"):
+        st.session_state[f"{key}_pedido"] = pedido
+    # El archivo se arma recién con el pedido, y solo mientras sigan los mismos datos y formato
+    if st.session_state.get(f"{key}_pedido") != pedido:
+        return
+    with st.spinner(get_text(lang, "preparing_export")):
+        data = _exportacion(clave, formato, nombre, encoding, df, imagenes)
+    st.download_button(
+        f"⬇️ {get_text(lang, 'download_file')}",
+        data=data,
+        file_name=f"{nombre}.{formato}",
+        mime=FORMATOS[formato][1],
+        key=f"{key}_descargar"
+    )
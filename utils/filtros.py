@@ -0,0 +1,94 @@
+import numpy as np
+import pandas as pd
+
+# Máscaras memoizadas por índice antes de vaciar el memo
+MAX_MEMO = 64
+
+_FALTA = object()
+
+
+def etiqueta_partido(df: pd.DataFrame) -> pd.Series:
+    # "18 Apr vs Vancouver FC", formateando solo las fechas únicas
+    codigos, fechas = pd.factorize(df['Fecha'])
+    fecha_str = np.append(pd.DatetimeIndex(fechas).strftime('%d %b').to_numpy(dtype=object), np.nan)
+    return pd.Series(fecha_str[codigos], index=df.index) + ' vs ' + df['Rival'].astype(object)
+
+
+def construir_indice(df: pd.DataFrame, columnas: list, columna_rango: str) -> dict:
+    """Índice invertido para filtrar sin recorrer el frame.
+
+    Por cada columna categórica guarda sus valores (en orden de aparición,
+    como `unique()`) y la lista ordenada de filas de cada valor; la columna de
+    rango se guarda ordenada para resolver `between` con búsqueda binaria.
+    """
+    indice = {"n": len(df), "columnas": {}, "memo": {}}
+    for col in columnas:
+        codigos, valores = pd.factorize(df[col], use_na_sentinel=True)
+        orden = np.argsort(codigos, kind='stable')
+        limites = np.searchsorted(codigos[orden], np.arange(-1, len(valores) + 1))
+        indice["columnas"][col] = {
+            "valores": list(valores),
+            "posicion": {valor: i for i, valor in enumerate(valores)},
+            "filas": [orden[limites[i + 1]:limites[i + 2]] for i in range(len(valores))],
+        }
+    rango = df[columna_rango].to_numpy()
+    orden = np.argsort(rango, kind='stable')
+    indice["rango"] = {"valores": rango[orden], "filas": orden}
+    return indice
+
+
+def opciones(indice: dict, col: str) -> list:
+    return indice["columnas"][col]["valores"]
+
+
+def _mascara_columna(indice: dict, col: str, seleccion) -> np.ndarray:
+    # None = selección completa: la columna no restringe nada
+    info = indice["columnas"][col]
+    posiciones = {info["posicion"][v] for v in seleccion if v in info["posicion"]}
+    if len(posiciones) == len(info["valores"]):
+        return None
+    mascara = np.zeros(indice["n"], dtype=bool)
+    for p in posiciones:
+        mascara[info["filas"][p]] = True
+    return mascara
+
+
+def _mascara_rango(indice: dict, minimo, maximo) -> np.ndarray:
+    valores = indice["rango"]["valores"]
+    lo = np.searchsorted(valores, minimo, side='left')
+    hi = np.searchsorted(valores, maximo, side='right')
+    if lo == 0 and hi == len(valores):
+        return None
+    mascara = np.zeros(indice["n"], dtype=bool)
+    mascara[indice["rango"]["filas"][lo:hi]] = True
+    return mascara
+
+
+def _memoizada(memo: dict, clave: tuple, calcular) -> np.ndarray:
+    # El índice es compartido entre sesiones: otro hilo puede vaciar el memo en cualquier
+    # momento, así que la máscara se usa desde la variable local y nunca se relee del memo
+    mascara = memo.get(clave, _FALTA)
+    if mascara is _FALTA:
+        mascara = memo[clave] = calcular()
+    return mascara
+
+
+def filtrar_filas(indice: dict, selecciones: dict, rango: tuple) -> np.ndarray:
+    """Posiciones de las filas que cumplen todos los filtros.
+
+    Cada máscara por columna se memoiza con su selección, así un rerun en el
+    que cambió un solo widget reutiliza las demás y solo intersecta.
+    """
+    memo = indice["memo"]
+    if len(memo) > MAX_MEMO:
+        memo.clear()
+    mascaras = [
+        _memoizada(memo, (col, frozenset(seleccion)), lambda: _mascara_columna(indice, col, seleccion))
+        for col, seleccion in selecciones.items()
+    ]
+    mascaras.append(_memoizada(memo, ("__rango__", tuple(rango)), lambda: _mascara_rango(indice, *rango)))
+
+    mascaras = [m for m in mascaras if m is not None]
+    if not mascaras:
+        return np.arange(indice["n"])
+    return np.flatnonzero(np.logical_and.reduce(mascaras))
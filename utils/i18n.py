@@ -1,17 +1,61 @@
 import json
 import os
+import threading
 from pathlib import Path
+from types import MappingProxyType
+
+# Ruta absoluta confiable
+I18N_PATH = Path(__file__).parent / "i18n.json"
+
+# Catálogo en memoria: un dict congelado por idioma, recargado solo si cambia el mtime
+_catalogo = {"mtime": None, "idiomas": {}}
+_lock = threading.Lock()
+
+
+def _cargar_catalogo():
+    mtime = os.stat(I18N_PATH).st_mtime_ns
+    if _catalogo["mtime"] != mtime:
+        with _lock:
+            if _catalogo["mtime"] != mtime:
+                with open(I18N_PATH, "r", encoding="utf-8") as f:
+                    translations = json.load(f)
+                _catalogo["idiomas"] = {
+                    lang: MappingProxyType(dict(textos))
+                    for lang, textos in translations.items()
+                }
+                _catalogo["mtime"] = mtime
+    return _catalogo["idiomas"]
+
+
+def get_catalog(lang: str):
+    return _cargar_catalogo().get(lang, MappingProxyType({}))
+
 
 def get_text(lang: str, key: str) -> str:
     try:
-        # Ruta absoluta confiable
-        current_dir = Path(__file__).parent
-        file_path = current_dir / "i18n.json"
-        
-        with open(file_path, "r", encoding="utf-8") as f:
-            translations = json.load(f)
-            
-        return translations.get(lang, {}).get(key, f"[{key}]")
-    
+        return get_catalog(lang).get(key, f"[{key}]")
+
     except Exception as e:
         return f"⚠️ Error: {str(e)}"
+
+
+def translate_column(lang: str, serie: "pd.Series", claves: dict = None) -> "pd.Series":
+    """Traduce una columna completa resolviendo solo sus valores únicos.
+
+    `claves` mapea cada valor de la columna a su clave en el catálogo; sin él
+    se usa el propio valor como clave. Los nulos se conservan.
+    """
+    # Import diferido: app.py importa este módulo al arrancar, antes de elegir página
+    import numpy as np
+    import pandas as pd
+
+    catalogo = get_catalog(lang)
+    codigos, categorias = pd.factorize(serie, use_na_sentinel=True)
+    if claves is not None:
+        categorias = [claves.get(valor, valor) for valor in categorias]
+    traducidas = np.array(
+        [catalogo.get(clave, f"[{clave}]") for clave in categorias] + [np.nan],
+        dtype=object
+    )
+    # El centinela -1 de factorize apunta al NaN del final
+    return pd.Series(traducidas[codigos], index=serie.index, name=serie.name)
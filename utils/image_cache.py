@@ -0,0 +1,99 @@
+import hashlib
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from pathlib import Path
+
+import requests
+from PIL import Image
+from requests.adapters import HTTPAdapter
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+CACHE_DIR = ROOT_DIR / ".cache" / "imagenes"
+OBJETOS_DIR = CACHE_DIR / "objetos"        # originales por sha256 del contenido
+URLS_DIR = CACHE_DIR / "urls"              # sha1(url) -> sha256 del contenido
+MINIATURAS_DIR = CACHE_DIR / "miniaturas"  # <sha256>-<ancho>.png
+
+MAX_WORKERS = 8
+TIMEOUT = 10
+REINTENTO_FALLIDAS = 300  # segundos antes de reintentar una URL que falló
+
+_sesion = {"session": None}
+_lock = threading.Lock()
+_fallidas = {}
+_resueltas = {}  # (url, ancho) -> ruta de la miniatura ya en disco
+
+
+def _session() -> requests.Session:
+    # Sesión compartida con un pool de conexiones por host del tamaño del thread pool
+    with _lock:
+        if _sesion["session"] is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=MAX_WORKERS)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _sesion["session"] = session
+        return _sesion["session"]
+
+
+def _escribir_atomico(path: Path, data: bytes):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.name}.{threading.get_ident()}.tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+
+def _descargar(url: str):
+    """sha256 del contenido de la URL, descargándolo solo la primera vez."""
+    ref = URLS_DIR / hashlib.sha1(url.encode("utf-8")).hexdigest()
+    if ref.exists():
+        return ref.read_text().strip()
+    if time.time() - _fallidas.get(url, 0) < REINTENTO_FALLIDAS:
+        return None
+    try:
+        response = _session().get(url, timeout=TIMEOUT)
+        response.raise_for_status()
+    except requests.RequestException:
+        _fallidas[url] = time.time()
+        return None
+    digest = hashlib.sha256(response.content).hexdigest()
+    objeto = OBJETOS_DIR / digest
+    if not objeto.exists():
+        _escribir_atomico(objeto, response.content)
+    _escribir_atomico(ref, digest.encode("utf-8"))
+    return digest
+
+
+def miniatura(url: str, ancho: int):
+    """Ruta local de la imagen redimensionada a `ancho` px, o None si no se pudo obtener."""
+    if not isinstance(url, str) or not url.startswith(("http://", "https://")):
+        return None
+    if (url, ancho) in _resueltas:
+        return _resueltas[(url, ancho)]
+    digest = _descargar(url)
+    if digest is None:
+        return None
+    destino = MINIATURAS_DIR / f"{digest}-{ancho}.png"
+    if not destino.exists():
+        try:
+            with Image.open(OBJETOS_DIR / digest) as img:
+                alto = max(1, round(img.height * ancho / img.width))
+                buffer = BytesIO()
+                img.resize((ancho, alto), Image.LANCZOS).save(buffer, format="PNG", optimize=True)
+        except OSError:
+            return None
+        _escribir_atomico(destino, buffer.getvalue())
+    _resueltas[(url, ancho)] = str(destino)
+    return str(destino)
+
+
+def precargar(pedidos) -> dict:
+    """Llena la caché en paralelo. `pedidos` son pares (url, ancho); devuelve {(url, ancho): ruta}."""
+    pedidos = list(dict.fromkeys(pedidos))
+    pendientes = [p for p in pedidos if p not in _resueltas]
+    if pendientes:
+        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as pool:
+            list(pool.map(lambda p: miniatura(*p), pendientes))
+    return {p: _resueltas.get(p) for p in pedidos}
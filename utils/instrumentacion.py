@@ -0,0 +1,130 @@
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+# Instrumentación por rerun de los pasos de cada página (carga, filtro, agregación, render).
+# Solo mide con el panel de depuración activado y en el hilo del script de Streamlit.
+CLAVE_ACTIVO = "debug_instrumentacion"
+CLAVE_REGISTROS = "_instrumentacion"
+MAX_REGISTROS = 2000  # historial por sesión exportable como JSONL
+
+_local = threading.local()
+
+
+def _rss_mb():
+    # Memoria residente del proceso (Linux); None si no se puede leer
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+def _filas(resultado):
+    # Filas procesadas: el primer DataFrame/Series del resultado. Sin importar pandas desde
+    # aquí: lo que app.py importa al arrancar (i18n, paginas, instrumentacion) no lo carga,
+    # así que entra recién con el primer módulo de página que lo usa
+    pd = sys.modules.get("pandas")
+    if pd is None:
+        return None
+    for valor in resultado if isinstance(resultado, tuple) else (resultado,):
+        if isinstance(valor, (pd.DataFrame, pd.Series)):
+            return len(valor)
+    return None
+
+
+def activo() -> bool:
+    if get_script_run_ctx() is None:
+        return False
+    return bool(st.session_state.get(CLAVE_ACTIVO, False))
+
+
+def _estado() -> dict:
+    return st.session_state.setdefault(CLAVE_REGISTROS, {"rerun": 0, "registros": []})
+
+
+def iniciar_rerun():
+    """Llamar al inicio de cada rerun: los pasos que siguen se agrupan bajo un nuevo número."""
+    if activo():
+        _estado()["rerun"] += 1
+
+
+@contextmanager
+def medir(paso: str, filas=None, fallos=None, cache: bool = False):
+    """Mide un paso: tiempo, filas, acierto de caché y delta de memoria.
+
+    `fallos` es una función que devuelve el contador de fallos de la caché del
+    paso (p. ej. `cache_info().misses` o `render_pitch.fallos_png`); si no sube, fue un acierto. Para las
+    cachés de Streamlit usar `cache=True` + `marcar_fallo()` en la función cacheada.
+    Dentro del bloque se puede completar el registro (`registro["filas"] = ...`).
+    """
+    if not activo():
+        yield {}
+        return
+
+    pila = _local.__dict__.setdefault("pila", [])
+    registro = {"paso": paso, "filas": filas, "cache": "hit" if cache else None}
+    pila.append(registro)
+    fallos_antes = fallos() if fallos else None
+    rss_antes = _rss_mb()
+    inicio = time.perf_counter()
+    try:
+        yield registro
+    finally:
+        segundos = time.perf_counter() - inicio
+        rss_despues = _rss_mb()
+        pila.pop()
+        if fallos:
+            registro["cache"] = "miss" if fallos() > fallos_antes else "hit"
+        estado = _estado()
+        registro.update({
+            "rerun": estado["rerun"],
+            "ts": time.time(),
+            "segundos": round(segundos, 6),
+            "memoria_mb": None if rss_antes is None or rss_despues is None else round(rss_despues - rss_antes, 3),
+            "nivel": len(pila),
+        })
+        estado["registros"].append(registro)
+        del estado["registros"][:-MAX_REGISTROS]
+
+
+def instrumentar(paso: str, cache: bool = False):
+    """Decorador de `medir`; con `cache=True` el paso cuenta como acierto salvo que
+    la función cacheada llame a `marcar_fallo()` (es decir, que se haya ejecutado)."""
+    def decorador(fn):
+        @wraps(fn)
+        def envoltura(*args, **kwargs):
+            with medir(paso, cache=cache) as registro:
+                resultado = fn(*args, **kwargs)
+                if registro and registro["filas"] is None:
+                    registro["filas"] = _filas(resultado)
+                return resultado
+        return envoltura
+    return decorador
+
+
+def marcar_fallo():
+    # Desde el cuerpo de una función cacheada: si corre, la caché no tenía el resultado
+    pila = getattr(_local, "pila", None)
+    if pila:
+        pila[-1]["cache"] = "miss"
+
+
+def registros(solo_ultimo_rerun: bool = False) -> list:
+    if get_script_run_ctx() is None:
+        return []
+    estado = _estado()
+    if solo_ultimo_rerun:
+        return [r for r in estado["registros"] if r["rerun"] == estado["rerun"]]
+    return list(estado["registros"])
+
+
+def exportar_jsonl(lista: list) -> str:
+    return "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in lista)
@@ -0,0 +1,42 @@
+import importlib
+import sys
+import threading
+import time
+
+# Páginas de la app: clave de traducción del menú -> módulo y función, importados al elegirlas
+PAGINAS = [
+    {"clave": "live_registration", "modulo": "modules.registro", "funcion": "registro_page", "lang": True},
+    {"clave": "analytics_panel", "modulo": "modules.analytics", "funcion": "analytics_page", "lang": True},
+    {"clave": "heatmaps_tab", "modulo": "modules.heatmaps", "funcion": "heatmaps_page", "lang": False},
+    {"clave": "evolution_tab", "modulo": "modules.evolucion", "funcion": "evolucion_page", "lang": True},
+]
+
+# Primer import de este módulo ~ arranque del proceso del servidor
+_INICIO = time.perf_counter()
+_arranque = {"importes": {}, "primera_pagina": None}
+_lock = threading.Lock()
+
+
+def cargar_pagina(pagina: dict):
+    """Función de la página, importando su módulo solo la primera vez (y midiendo cuánto tardó)."""
+    modulo = pagina["modulo"]
+    if modulo not in sys.modules:
+        with _lock:
+            if modulo not in sys.modules:
+                inicio = time.perf_counter()
+                importlib.import_module(modulo)
+                _arranque["importes"][modulo] = time.perf_counter() - inicio
+    return getattr(sys.modules[modulo], pagina["funcion"])
+
+
+def marcar_primera_pagina():
+    # Arranque en frío: desde el inicio del proceso hasta la primera página dibujada
+    if _arranque["primera_pagina"] is None:
+        _arranque["primera_pagina"] = time.perf_counter() - _INICIO
+
+
+def reporte_arranque() -> dict:
+    return {
+        "arranque_frio": _arranque["primera_pagina"],
+        "importes": dict(_arranque["importes"]),
+    }
@@ -0,0 +1,63 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+# Render concurrente de secciones (por defecto si hay más de un núcleo);
+# ABP_RENDER_PARALELO=0/1 lo fuerza
+NUCLEOS = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else (os.cpu_count() or 1)
+RENDER_PARALELO = os.environ.get("ABP_RENDER_PARALELO", "1" if NUCLEOS > 1 else "0") != "0"
+MAX_PROCESOS = 2  # los dos mapas de calor de matplotlib
+MAX_HILOS = 4     # figuras de Plotly
+
+_pools = {}
+_lock = threading.Lock()
+
+
+def pool_procesos(initializer=None):
+    """Pool de procesos compartido (spawn: seguro con los hilos del servidor de Streamlit)."""
+    if not RENDER_PARALELO:
+        return None
+    with _lock:
+        if "procesos" not in _pools:
+            _pools["procesos"] = ProcessPoolExecutor(
+                max_workers=MAX_PROCESOS,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=initializer
+            )
+        return _pools["procesos"]
+
+
+def pool_hilos():
+    if not RENDER_PARALELO:
+        return None
+    with _lock:
+        if "hilos" not in _pools:
+            _pools["hilos"] = ThreadPoolExecutor(max_workers=MAX_HILOS, thread_name_prefix="render")
+        return _pools["hilos"]
+
+
+def inmediato(fn, *args, **kwargs) -> Future:
+    # Future ya resuelto: mismo contrato que un pool, sin concurrencia
+    futuro = Future()
+    try:
+        futuro.set_result(fn(*args, **kwargs))
+    except Exception as e:
+        futuro.set_exception(e)
+    return futuro
+
+
+def enviar(pool, fn, *args, **kwargs) -> Future:
+    """Ejecuta `fn` en `pool`, o en el hilo actual si no hay pool o el pool se rompió."""
+    if pool is None:
+        return inmediato(fn, *args, **kwargs)
+    try:
+        return pool.submit(fn, *args, **kwargs)
+    except (BrokenProcessPool, RuntimeError):
+        # Un proceso murió o el intérprete está cerrando: descartar el pool y seguir en serie
+        with _lock:
+            for nombre, actual in list(_pools.items()):
+                if actual is pool:
+                    del _pools[nombre]
+        return inmediato(fn, *args, **kwargs)
@@ -0,0 +1,141 @@
+"""Buffer columnar del registro en vivo de una sesión.
+
+Una columna por campo (array tipado para los numéricos, lista para el resto),
+altas al final en O(1) y bajas como lápida: la fila queda marcada y se omite
+en la vista. Cada cambio sube `version`; la vista en DataFrame (completa y por
+equipo) se arma una sola vez por versión y se reutiliza entre reruns.
+"""
+from array import array
+
+import numpy as np
+import pandas as pd
+
+# Campos numéricos con array tipado; si llega un valor que no encaja, la columna pasa a lista
+TIPOS = {
+    'Minuto': 'h',
+    'x_saque': 'd',
+    'y_saque': 'd',
+    'x_remate': 'd',
+    'y_remate': 'd',
+}
+
+# Compactar (descartar filas con lápida) cuando son más de la mitad del buffer
+FRACCION_COMPACTAR = 0.5
+
+
+def nuevo_buffer() -> dict:
+    return {
+        "columnas": {},
+        "ids": array('q'),
+        "versiones": array('q'),
+        "vivas": bytearray(),
+        "posicion": {},  # id de la acción -> fila del buffer
+        "borradas": 0,
+        "version": 0,
+        "vistas": {},
+        "vistas_version": -1,
+    }
+
+
+def _columna_nueva(col: str, filas: int):
+    # Columna que aparece con filas ya cargadas: se rellena con NaN (enteros: lista con None)
+    tipo = TIPOS.get(col)
+    if tipo == 'd':
+        return array('d', [np.nan]) * filas
+    if tipo and not filas:
+        return array(tipo)
+    return [None] * filas
+
+
+def _agregar_valor(buffer: dict, col: str, valor):
+    columna = buffer["columnas"][col]
+    if isinstance(columna, array):
+        try:
+            columna.append(np.nan if valor is None and columna.typecode == 'd' else valor)
+            return
+        except (TypeError, OverflowError):
+            buffer["columnas"][col] = columna = columna.tolist()
+    columna.append(valor)
+
+
+def anexar(buffer: dict, id_accion: int, version: int, datos: dict):
+    """Agrega una acción al final del buffer."""
+    filas = len(buffer["ids"])
+    for col in datos:
+        if col not in buffer["columnas"]:
+            buffer["columnas"][col] = _columna_nueva(col, filas)
+    for col in buffer["columnas"]:
+        _agregar_valor(buffer, col, datos.get(col))
+    buffer["ids"].append(id_accion)
+    buffer["versiones"].append(version)
+    buffer["vivas"].append(1)
+    buffer["posicion"][id_accion] = filas
+    buffer["version"] += 1
+
+
+def borrar(buffer: dict, id_accion: int):
+    """Marca la acción con lápida y devuelve sus datos (None si no está en el buffer)."""
+    idx = buffer["posicion"].pop(id_accion, None)
+    if idx is None:
+        return None
+    datos = {col: valores[idx] for col, valores in buffer["columnas"].items()}
+    buffer["vivas"][idx] = 0
+    buffer["borradas"] += 1
+    buffer["version"] += 1
+    if buffer["borradas"] > FRACCION_COMPACTAR * len(buffer["ids"]):
+        _compactar(buffer)
+    return datos
+
+
+def _compactar(buffer: dict):
+    filas = [i for i, viva in enumerate(buffer["vivas"]) if viva]
+    for col, valores in buffer["columnas"].items():
+        compacta = [valores[i] for i in filas]
+        buffer["columnas"][col] = array(valores.typecode, compacta) if isinstance(valores, array) else compacta
+    buffer["ids"] = array('q', (buffer["ids"][i] for i in filas))
+    buffer["versiones"] = array('q', (buffer["versiones"][i] for i in filas))
+    buffer["vivas"] = bytearray(b"\x01") * len(filas)
+    buffer["posicion"] = {id_accion: i for i, id_accion in enumerate(buffer["ids"])}
+    buffer["borradas"] = 0
+
+
+def filas_vivas(buffer: dict) -> int:
+    return len(buffer["posicion"])
+
+
+def _mascara(buffer: dict) -> np.ndarray:
+    return np.frombuffer(bytes(buffer["vivas"]), dtype=np.uint8).astype(bool)
+
+
+def ids_vivos(buffer: dict) -> np.ndarray:
+    """Ids de las acciones vigentes, en el orden de las filas de la vista."""
+    return np.frombuffer(buffer["ids"], dtype=np.int64)[_mascara(buffer)]
+
+
+def versiones_vivas(buffer: dict) -> np.ndarray:
+    return np.frombuffer(buffer["versiones"], dtype=np.int64)[_mascara(buffer)]
+
+
+def vista(buffer: dict, equipo: str = None) -> pd.DataFrame:
+    """DataFrame de las filas vigentes (opcionalmente de un equipo), cacheado por versión.
+
+    No modificar el resultado: se reutiliza hasta el próximo cambio del buffer.
+    """
+    if buffer["vistas_version"] != buffer["version"]:
+        buffer["vistas"] = {}
+        buffer["vistas_version"] = buffer["version"]
+    if equipo in buffer["vistas"]:
+        return buffer["vistas"][equipo]
+
+    if equipo is None:
+        mascara = _mascara(buffer)
+        df = pd.DataFrame({
+            col: np.frombuffer(valores, dtype=np.float64 if valores.typecode == 'd' else np.int16)[mascara]
+            if isinstance(valores, array) else np.array(valores, dtype=object)[mascara]
+            for col, valores in buffer["columnas"].items()
+        })
+    else:
+        df = vista(buffer)
+        df = df[df["Equipo"] == equipo].reset_index(drop=True)
+    buffer["vistas"][equipo] = df
+    return df
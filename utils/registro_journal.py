@@ -0,0 +1,163 @@
+import datetime
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+JOURNAL_DIR = ROOT_DIR / ".cache" / "registro"
+JOURNAL_PATH = JOURNAL_DIR / "registro.db"
+
+# fsync por lotes: checkpoint del WAL cada N escrituras o cada N segundos
+LOTE_FSYNC = 20
+INTERVALO_FSYNC = 2.0
+
+_lock = threading.Lock()
+_estado = {"conn": None, "pendientes": 0, "ultimo_fsync": 0.0}
+
+
+def _codificar(valor):
+    if isinstance(valor, datetime.date):
+        return {"$date": valor.isoformat()}
+    raise TypeError(f"Tipo no serializable: {type(valor).__name__}")
+
+
+def _decodificar(obj):
+    if set(obj) == {"$date"}:
+        return datetime.date.fromisoformat(obj["$date"])
+    return obj
+
+
+def _migrar_journal(conn: sqlite3.Connection):
+    # Formato anterior: log de operaciones add/del; se reproduce sobre la tabla de filas
+    existe = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'journal'").fetchone()
+    if not existe:
+        return
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        for seq, op, ref, datos, ts in conn.execute("SELECT seq, op, ref, datos, ts FROM journal ORDER BY seq").fetchall():
+            if op == "add":
+                conn.execute(
+                    "INSERT INTO acciones (id, version, borrado, analista, datos, ts) VALUES (?, ?, 0, NULL, ?, ?)",
+                    (seq, seq, datos, ts)
+                )
+            elif op == "del":
+                conn.execute("UPDATE acciones SET borrado = 1, version = ? WHERE id = ?", (seq, ref))
+        conn.execute("DROP TABLE journal")
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+
+
+def _conexion() -> sqlite3.Connection:
+    if _estado["conn"] is None:
+        JOURNAL_DIR.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(JOURNAL_PATH, check_same_thread=False, isolation_level=None, timeout=10)
+        # WAL + synchronous=NORMAL: el commit no hace fsync, lo hace el checkpoint
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        # Una fila por acción con su sello de versión; borrar = lápida que sube la versión
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS acciones (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                version INTEGER NOT NULL,
+                borrado INTEGER NOT NULL DEFAULT 0,
+                analista TEXT,
+                datos TEXT NOT NULL,
+                ts REAL NOT NULL
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS acciones_version ON acciones (version)")
+        conn.execute("CREATE TABLE IF NOT EXISTS meta (clave TEXT PRIMARY KEY, valor TEXT)")
+        conn.execute(
+            "INSERT OR IGNORE INTO meta (clave, valor) VALUES ('journal_id', ?)",
+            (uuid.uuid4().hex,)
+        )
+        _migrar_journal(conn)
+        _estado["conn"] = conn
+    return _estado["conn"]
+
+
+def _transaccion(fn):
+    """Ejecuta `fn(conn, version)` con el lock de escritura de SQLite tomado.
+
+    BEGIN IMMEDIATE serializa a los escritores (también entre procesos), así
+    `version` = máxima + 1 es única y creciente sin coordinar a las sesiones.
+    """
+    with _lock:
+        conn = _conexion()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            version = conn.execute("SELECT COALESCE(MAX(version), 0) + 1 FROM acciones").fetchone()[0]
+            resultado = fn(conn, version)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        _estado["pendientes"] += 1
+        ahora = time.monotonic()
+        if _estado["pendientes"] >= LOTE_FSYNC or ahora - _estado["ultimo_fsync"] >= INTERVALO_FSYNC:
+            conn.execute("PRAGMA wal_checkpoint(PASSIVE)")
+            _estado["pendientes"] = 0
+            _estado["ultimo_fsync"] = ahora
+        return resultado
+
+
+def registrar_accion(datos: dict, analista: str = None) -> int:
+    """Añade una acción al registro compartido y devuelve su id.
+
+    Las altas nunca chocan: cada una es una fila nueva con su propia versión.
+    """
+    payload = json.dumps(datos, default=_codificar, ensure_ascii=False)
+    return _transaccion(lambda conn, version: conn.execute(
+        "INSERT INTO acciones (version, borrado, analista, datos, ts) VALUES (?, 0, ?, ?, ?)",
+        (version, analista, payload, time.time())
+    ).lastrowid)
+
+
+def eliminar_accion(id_accion: int, version_vista: int) -> bool:
+    """Borra una acción si sigue en la versión que vio la sesión (concurrencia optimista).
+
+    Devuelve False si otro analista ya la borró o cambió: no se pisa su operación.
+    """
+    return _transaccion(lambda conn, version: conn.execute(
+        "UPDATE acciones SET borrado = 1, version = ? WHERE id = ? AND version = ? AND borrado = 0",
+        (version, id_accion, version_vista)
+    ).rowcount == 1)
+
+
+def journal_id() -> str:
+    """Identifica el registro vigente; cambia al archivarlo."""
+    with _lock:
+        return _conexion().execute("SELECT valor FROM meta WHERE clave = 'journal_id'").fetchone()[0]
+
+
+def leer_desde(version: int = 0) -> list:
+    """Filas cambiadas después de `version` (altas y lápidas), en orden de versión.
+
+    Tuplas (id, version, borrado, analista, datos); `datos` es None en las lápidas.
+    """
+    with _lock:
+        filas = _conexion().execute(
+            "SELECT id, version, borrado, analista, CASE WHEN borrado THEN NULL ELSE datos END "
+            "FROM acciones WHERE version > ? ORDER BY version",
+            (version,)
+        ).fetchall()
+    return [
+        (id_accion, v, bool(borrado), analista, json.loads(datos, object_hook=_decodificar) if datos else None)
+        for id_accion, v, borrado, analista, datos in filas
+    ]
+
+
+def archivar_journal():
+    """Cierra el registro actual y lo guarda con marca de tiempo para empezar uno nuevo."""
+    with _lock:
+        if _estado["conn"] is not None:
+            _estado["conn"].execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            _estado["conn"].close()
+            _estado["conn"] = None
+        if JOURNAL_PATH.exists():
+            JOURNAL_PATH.rename(JOURNAL_DIR / f"registro-{time.strftime('%Y%m%d-%H%M%S')}.db")
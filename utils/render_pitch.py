@@ -0,0 +1,175 @@
+import io
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+from matplotlib.colors import BoundaryNorm
+import numpy as np
+from mplsoccer import VerticalPitch
+
+from utils import paralelo
+from utils.densidad import MALLA_X, MALLA_Y, densidad_zonas, niveles_densidad
+
+# Estilos de medio campo usados por cada página
+ESTILOS = {
+    "analytics": {"linewidth": 1.2},
+    "registro": {"linewidth": 1.5},
+}
+FIGSIZE = (12, 8)
+DPI = 100
+
+# Única caché de PNG: en el proceso principal, acotada por bytes (cada PNG pesa ~0,7 MB).
+# Los procesos de render no guardan nada; solo dibujan lo que se les pide.
+MAX_BYTES_PNG = 64 * 2**20
+_pngs = OrderedDict()
+_lock_pngs = threading.Lock()
+_estado_pngs = {"bytes": 0, "fallos": 0}
+_fondos = {}
+
+
+def crear_pitch(estilo: str) -> VerticalPitch:
+    return VerticalPitch(
+        pitch_type='statsbomb',
+        pitch_color='grass',
+        line_color='white',
+        half=True,
+        goal_type='box',
+        **ESTILOS[estilo]
+    )
+
+
+def fondo_pitch(estilo: str) -> tuple:
+    """Medio campo rasterizado una sola vez por proceso: (rgba, xlim, ylim)."""
+    if estilo not in _fondos:
+        _fondos[estilo] = _rasterizar_pitch(estilo)
+    return _fondos[estilo]
+
+
+def instalar_fondos(fondos: dict):
+    # Inicializador de procesos: reutilizar los fondos ya rasterizados por el proceso padre
+    _fondos.update(fondos)
+
+
+def _rasterizar_pitch(estilo: str) -> tuple:
+    fig = plt.figure(figsize=FIGSIZE, dpi=DPI)
+    try:
+        ax = fig.add_axes([0, 0, 1, 1])
+        crear_pitch(estilo).draw(ax=ax)
+        fig.canvas.draw()
+        # Recortar al área real del eje (el aspecto igual deja márgenes)
+        bbox = ax.get_window_extent()
+        alto = fig.canvas.get_width_height()[1]
+        rgba = np.asarray(fig.canvas.buffer_rgba())[
+            int(round(alto - bbox.y1)):int(round(alto - bbox.y0)),
+            int(round(bbox.x0)):int(round(bbox.x1))
+        ].copy()
+        rgba.setflags(write=False)
+        return rgba, ax.get_xlim(), ax.get_ylim()
+    finally:
+        plt.close(fig)
+
+
+def _cmap_capa(cmap: str, niveles: np.ndarray):
+    # Bandas de color por nivel (como contourf); transparente bajo el umbral
+    colores = plt.get_cmap(cmap).resampled(len(niveles) - 1)
+    colores.set_under((0, 0, 0, 0))
+    return colores, BoundaryNorm(niveles, colores.N)
+
+
+def renderizar_heatmap(estilo: str, conteos: tuple, bw_adjust: float, cmap: str, alpha: float,
+                       titulo: str, levels: int = 100, thresh: float = 0.05) -> bytes:
+    """PNG final del mapa de calor, sin caché (lo que corre en los procesos de render)."""
+    fondo, xlim, ylim = fondo_pitch(estilo)
+    densidad = densidad_zonas(np.asarray(conteos), bw_adjust)
+
+    fig, ax = plt.subplots(figsize=FIGSIZE, dpi=DPI)
+    try:
+        ax.imshow(fondo, extent=(*xlim, *ylim), interpolation='none', zorder=1)
+        if densidad is not None:
+            colores, norm = _cmap_capa(cmap, niveles_densidad(densidad, levels, thresh))
+            # Vertical: eje horizontal = y de la cancha, eje vertical = x
+            ax.imshow(
+                densidad.T,
+                extent=(MALLA_Y[0], MALLA_Y[-1], MALLA_X[0], MALLA_X[-1]),
+                origin='lower',
+                cmap=colores,
+                norm=norm,
+                alpha=alpha,
+                interpolation='bilinear',
+                zorder=2
+            )
+        ax.set_xlim(xlim)
+        ax.set_ylim(ylim)
+        ax.axis('off')
+        ax.set_title(titulo, fontsize=16, pad=20, fontweight='bold')
+        buffer = io.BytesIO()
+        fig.savefig(buffer, format='png', bbox_inches='tight', pil_kwargs={'compress_level': 1})
+        return buffer.getvalue()
+    finally:
+        plt.close(fig)
+
+
+def precalentar():
+    # Inicializador de los procesos de render: fondos listos antes del primer pedido
+    for estilo in ESTILOS:
+        fondo_pitch(estilo)
+
+
+def _clave_png(estilo: str, conteos: tuple, bw_adjust: float, cmap: str, alpha: float,
+               titulo: str, levels: int = 100, thresh: float = 0.05) -> tuple:
+    return (estilo, tuple(conteos), float(bw_adjust), cmap, float(alpha), titulo, levels, float(thresh))
+
+
+def _png_en_cache(clave: tuple):
+    with _lock_pngs:
+        png = _pngs.get(clave)
+        if png is not None:
+            _pngs.move_to_end(clave)
+        return png
+
+
+def _guardar_png(clave: tuple, png: bytes):
+    with _lock_pngs:
+        if clave in _pngs:
+            return
+        _pngs[clave] = png
+        _estado_pngs["bytes"] += len(png)
+        while _estado_pngs["bytes"] > MAX_BYTES_PNG and len(_pngs) > 1:
+            _estado_pngs["bytes"] -= len(_pngs.popitem(last=False)[1])
+
+
+def heatmap_png(estilo: str, conteos: tuple, *args, **kwargs) -> bytes:
+    """renderizar_heatmap memoizado por conteos por zona, parámetros y título (en este proceso)."""
+    clave = _clave_png(estilo, conteos, *args, **kwargs)
+    png = _png_en_cache(clave)
+    if png is None:
+        _estado_pngs["fallos"] += 1
+        png = renderizar_heatmap(estilo, conteos, *args, **kwargs)
+        _guardar_png(clave, png)
+    return png
+
+
+def fallos_png() -> int:
+    # Contador de PNG renderizados por no estar en la caché (para la instrumentación)
+    return _estado_pngs["fallos"]
+
+
+def limpiar_pngs():
+    with _lock_pngs:
+        _pngs.clear()
+        _estado_pngs["bytes"] = 0
+
+
+def heatmap_png_futuro(estilo: str, conteos: tuple, **kwargs) -> Future:
+    """heatmap_png en el pool de procesos de render; Future ya resuelto si el PNG está en memoria."""
+    clave = _clave_png(estilo, conteos, **kwargs)
+    png = _png_en_cache(clave)
+    if png is not None:
+        return paralelo.inmediato(lambda: png)
+    _estado_pngs["fallos"] += 1
+    futuro = paralelo.enviar(paralelo.pool_procesos(precalentar), renderizar_heatmap, estilo, conteos, **kwargs)
+    futuro.add_done_callback(lambda f: f.exception() is None and _guardar_png(clave, f.result()))
+    return futuro
@@ -0,0 +1,69 @@
+import hashlib
+import os
+import re
+from pathlib import Path
+
+import pandas as pd
+
+from utils.esquema import VERSION_ESQUEMA, validar
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+CACHE_DIR = ROOT_DIR / ".cache" / "seasons"
+SEASON_PATTERN = re.compile(r"^Cavalry(\d{4})stats\.xlsx$")
+
+# Hash de contenido por (ruta, mtime, tamaño) y frames ya leídos por hash
+_hashes = {}
+_frames = {}
+
+
+def descubrir_temporadas(directorio: Path = ROOT_DIR) -> dict:
+    temporadas = {}
+    for path in Path(directorio).iterdir():
+        match = SEASON_PATTERN.match(path.name)
+        if match:
+            temporadas[int(match.group(1))] = path
+    return dict(sorted(temporadas.items()))
+
+
+def _hash_contenido(path: Path) -> str:
+    stat = path.stat()
+    clave = (str(path), stat.st_mtime_ns, stat.st_size)
+    if clave not in _hashes:
+        _hashes[clave] = hashlib.sha1(path.read_bytes()).hexdigest()
+    return _hashes[clave]
+
+
+def cargar_temporada(path: Path) -> pd.DataFrame:
+    """Lee un libro de temporada, validado y convertido una sola vez a Parquet por hash de contenido.
+
+    Las violaciones no fatales del esquema quedan en `df.attrs["violaciones"]`
+    (se guardan con el Parquet); si falta una columna requerida lanza ErrorEsquema.
+    """
+    path = Path(path)
+    digest = _hash_contenido(path)
+    if digest not in _frames:
+        cache_path = CACHE_DIR / f"{path.stem}-{digest[:16]}-e{VERSION_ESQUEMA}.parquet"
+        if cache_path.exists():
+            df = pd.read_parquet(cache_path)
+        else:
+            df, violaciones = validar(pd.read_excel(path), "temporadas")
+            df.attrs["violaciones"] = violaciones
+            CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            tmp = cache_path.with_suffix(".tmp")
+            df.to_parquet(tmp, index=False)
+            os.replace(tmp, cache_path)
+            # Descartar conversiones de versiones anteriores del mismo libro
+            for viejo in CACHE_DIR.glob(f"{path.stem}-*.parquet"):
+                if viejo != cache_path:
+                    viejo.unlink(missing_ok=True)
+        _frames[digest] = df
+    return _frames[digest].copy()
+
+
+def libros_leidos() -> int:
+    # Libros convertidos/leídos en este proceso: si no sube, todo salió de memoria
+    return len(_frames)
+
+
+def cargar_temporadas(directorio: Path = ROOT_DIR) -> dict:
+    return {year: cargar_temporada(path) for year, path in descubrir_temporadas(directorio).items()}
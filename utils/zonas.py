@@ -0,0 +1,42 @@
+import numpy as np
+import pandas as pd
+
+# Registro único de zonas del medio campo (ver MedioCampo_enumerado.JPG)
+ZONAS_COORDS = {
+    1: (120, 0), 2: (120, 80), 3: (93, 9), 4: (93, 71),
+    5: (114, 30), 6: (114, 50), 7: (114, 40), 8: (111, 15),
+    9: (111, 65), 10: (105, 35), 11: (105, 45), 12: (105, 25),
+    13: (105, 55), 14: (93, 29), 15: (93, 51), 16: (72, 20),
+    17: (72, 60), "Penal": (108, 40)
+}
+
+# Código entero compacto por zona y tablas de coordenadas indexadas por código
+ZONAS = list(ZONAS_COORDS)
+CODIGO_ZONA = {zona: codigo for codigo, zona in enumerate(ZONAS)}
+SIN_ZONA = -1
+ZONA_X = np.array([x for x, _ in ZONAS_COORDS.values()], dtype=np.float64)
+ZONA_Y = np.array([y for _, y in ZONAS_COORDS.values()], dtype=np.float64)
+
+# Número de "Penal" en las columnas de zona enteras (int8) del almacén tipado
+ZONA_PENAL = 18
+
+
+def codigo_zona(valor) -> int:
+    # Acepta 7, 7.0, "7", "Penal" y ZONA_PENAL, tal como llegan del CSV, del formulario o del almacén
+    if isinstance(valor, str):
+        valor = valor.strip()
+        if valor.isdigit():
+            valor = int(valor)
+    elif isinstance(valor, (float, np.floating)) and float(valor).is_integer():
+        valor = int(valor)
+    if valor == ZONA_PENAL:
+        valor = "Penal"
+    return CODIGO_ZONA.get(valor, SIN_ZONA)
+
+
+def codificar_zonas(serie: pd.Series) -> np.ndarray:
+    """Códigos int8 por fila (SIN_ZONA si no corresponde a ninguna zona)."""
+    codigos, valores = pd.factorize(serie, use_na_sentinel=True)
+    tabla = np.array([codigo_zona(v) for v in valores] + [SIN_ZONA], dtype=np.int8)
+    return tabla[codigos]
+